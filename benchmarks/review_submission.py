@@ -0,0 +1,128 @@
+# Review submissions per second through ReviewService.create_review for
+# published forms with 10, 100 and 500 choice items, and how long folding
+# their result deltas into form_item_stats takes afterwards.
+#
+# It creates its own users and forms in the configured database and deletes
+# them afterwards, so point it at a development database. Run from the
+# repository root:
+#     python -m benchmarks.review_submission
+import asyncio
+import time
+import uuid
+
+from src.database import async_session_maker
+from src.forms.dao import FormDAO, ItemDAO, OptionDAO
+from src.forms.models import FormModel
+from src.forms.reviews.maintenance import ResultStatsFolder
+from src.forms.reviews.schemas import AnswerCreate, ReviewCreate
+from src.forms.reviews.service import ReviewService
+from src.forms.schemas import FormCreate
+from src.forms.service import FormService
+from src.forms.utils import ORDER_KEY_GAP
+from src.users.dao import UserDAO
+from src.users.models import UserModel
+
+ITEM_COUNTS = (10, 100, 500)
+OPTIONS_PER_ITEM = 4
+SUBMISSIONS = 500
+CONCURRENCY = 10
+
+
+async def create_users(count: int) -> list[uuid.UUID]:
+    async with async_session_maker() as session:
+        users = await UserDAO.add_bulk(
+            session,
+            [
+                {
+                    "email": f"bench-{uuid.uuid4()}@example.com",
+                    "fio": "Benchmark",
+                    "hashed_password": "-",
+                    "is_verified": True,
+                }
+                for _ in range(count)
+            ],
+        )
+        await session.commit()
+        return [user.id for user in users]
+
+
+async def create_form(
+    creator_id: uuid.UUID, items: int
+) -> tuple[int, list[AnswerCreate]]:
+    async with async_session_maker() as session:
+        form = await FormDAO.add_with_link(session, FormCreate(creator_id=creator_id))
+        item_rows = await ItemDAO.add_bulk(
+            session,
+            [
+                {
+                    "title": f"Question {n}",
+                    "item_type": "choiceQuestion",
+                    "order_key": (n + 1) * ORDER_KEY_GAP,
+                    "required": True,
+                    "form_id": form.id,
+                }
+                for n in range(items)
+            ],
+        )
+        options = await OptionDAO.add_bulk(
+            session,
+            [
+                {"title": f"Option {n}", "item_id": item.id}
+                for item in item_rows
+                for n in range(OPTIONS_PER_ITEM)
+            ],
+        )
+        await session.commit()
+        await FormService.form_to_review(session, form.id, creator_id)
+
+    first_option = {}
+    for option in options:
+        first_option.setdefault(option.item_id, option.id)
+    answers = [
+        AnswerCreate(item_id=item.id, promt={"options": [first_option[item.id]]})
+        for item in item_rows
+    ]
+    return form.id, answers
+
+
+async def submit(form_id: int, user_id: uuid.UUID, answers, limit) -> None:
+    async with limit, async_session_maker() as session:
+        await ReviewService.create_review(
+            session, ReviewCreate(form_id=form_id, user_id=user_id), answers
+        )
+
+
+async def main() -> None:
+    user_ids = await create_users(SUBMISSIONS + 1)
+    creator_id, respondents = user_ids[0], user_ids[1:]
+    form_ids = []
+    try:
+        for items in ITEM_COUNTS:
+            form_id, answers = await create_form(creator_id, items)
+            form_ids.append(form_id)
+
+            limit = asyncio.Semaphore(CONCURRENCY)
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(submit(form_id, user_id, answers, limit) for user_id in respondents)
+            )
+            elapsed = time.perf_counter() - started
+
+            folder = ResultStatsFolder(interval=0, budget=60, batch_size=10000)
+            fold_started = time.perf_counter()
+            await folder.run_once()
+            fold_elapsed = time.perf_counter() - fold_started
+            print(
+                f"{items:>4} items: {SUBMISSIONS / elapsed:8.1f} reviews/s, "
+                f"{SUBMISSIONS * items / elapsed:10.1f} answers/s, "
+                f"fold {folder.rows['folded']} deltas in {fold_elapsed * 1000:.1f} ms"
+            )
+    finally:
+        async with async_session_maker() as session:
+            await FormDAO.delete(session, FormModel.id.in_(form_ids))
+            await UserDAO.delete(session, UserModel.id.in_(user_ids))
+            await session.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
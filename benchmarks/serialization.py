@@ -0,0 +1,83 @@
+# Compares the default FastAPI response path with src.responses.Serializer on
+# a 200-item form built from plain attribute objects, as returned by the ORM.
+#
+# Run from the repository root with the app's environment (.env) available:
+#     python -m benchmarks.serialization
+import json
+import timeit
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from pydantic import TypeAdapter
+
+from src.forms.schemas import Form
+from src.responses import Serializer
+
+ITEMS = 200
+OPTIONS_PER_ITEM = 4
+NUMBER = 200
+
+
+def build_form() -> SimpleNamespace:
+    items = []
+    for item_id in range(1, ITEMS + 1):
+        options = [
+            SimpleNamespace(
+                id=item_id * OPTIONS_PER_ITEM + n, title=f"Option {n}", item_id=item_id
+            )
+            for n in range(OPTIONS_PER_ITEM)
+        ]
+        items.append(
+            SimpleNamespace(
+                id=item_id,
+                title=f"Question {item_id}",
+                description="Pick the answer that fits best",
+                item_type="choiceQuestion",
+                item_order=item_id,
+                required=True,
+                form_id=1,
+                options=options,
+            )
+        )
+    return SimpleNamespace(
+        id=1,
+        title="Survey",
+        description="Benchmark form",
+        is_template=False,
+        organization="okb.jpg",
+        color="red",
+        link="http://127.0.0.1:3000/forms/1",
+        creator_id=uuid.uuid4(),
+        created_at=datetime.now(timezone.utc),
+        items=items,
+    )
+
+
+def main() -> None:
+    form = build_form()
+    adapter = TypeAdapter(Form)
+    serializer = Serializer(Form)
+    validated = serializer.adapter.validate_python(form, from_attributes=True)
+
+    def fastapi_path() -> bytes:
+        # What a `-> Form` route does: validate, dump to JSON-able python,
+        # then json.dumps in JSONResponse.render.
+        value = adapter.validate_python(form, from_attributes=True)
+        content = adapter.dump_python(value, mode="json")
+        return json.dumps(
+            content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+    cases = {
+        "fastapi response_model": fastapi_path,
+        "Serializer": lambda: serializer.dump_json(form),
+        "Serializer, trusted": lambda: serializer.dump_json(validated, trusted=True),
+    }
+    for name, case in cases.items():
+        seconds = min(timeit.repeat(case, number=NUMBER, repeat=5)) / NUMBER
+        print(f"{name:<24} {seconds * 1000:8.3f} ms/response")
+
+
+if __name__ == "__main__":
+    main()
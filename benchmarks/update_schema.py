@@ -0,0 +1,49 @@
+# Parses 1,000-operation editor saves in the tagged ("op") format and in the
+# original wrapper-only format that goes through the compatibility adapter.
+#
+# Run from the repository root with the app's environment (.env) available:
+#     python -m benchmarks.update_schema
+import timeit
+
+from src.forms.schemas import LEGACY_REQUEST_OPS, UpdateSchema
+
+OPERATIONS = 1000
+NUMBER = 50
+
+LEGACY_REQUESTS = [
+    {"updateForm": {"title": "Survey"}},
+    {"createItem": {"title": "Question", "item_order": 1, "form_id": 1}},
+    {"moveItem": {"original_location": 1, "new_location": 3}},
+    {"deleteItem": {"id": 1, "location": 1}},
+    {"updateItem": {"item_id": 1, "item": {"title": "Question"}}},
+    {"createOption": {"title": "Option", "item_id": 1}},
+    {"deleteOptionId": 1},
+    {"updateOption": {"option_id": 1, "option": {"title": "Option"}}},
+]
+
+
+def build_payload(tagged: bool) -> dict:
+    requests = []
+    for n in range(OPERATIONS):
+        request = LEGACY_REQUESTS[n % len(LEGACY_REQUESTS)]
+        if tagged:
+            request = {"op": LEGACY_REQUEST_OPS[next(iter(request))], **request}
+        requests.append(request)
+    return {"includeFormInResponse": False, "requests": requests}
+
+
+def main() -> None:
+    for name, payload in {
+        "tagged": build_payload(tagged=True),
+        "legacy": build_payload(tagged=False),
+    }.items():
+        seconds = min(
+            timeit.repeat(
+                lambda: UpdateSchema.model_validate(payload), number=NUMBER, repeat=5
+            )
+        )
+        print(f"{name:<8} {seconds / NUMBER * 1000:8.3f} ms/payload")
+
+
+if __name__ == "__main__":
+    main()
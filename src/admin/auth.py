@@ -4,6 +4,7 @@ from sqladmin.authentication import AuthenticationBackend
 from starlette.requests import Request
 from starlette.responses import RedirectResponse
 
+from src.database import async_session_maker
 from src.users.dependencies import get_current_user
 from src.users.service import AuthService
 
@@ -13,9 +14,10 @@ class AdminAuth(AuthenticationBackend):
         form = await request.form()
         email, password = form["username"], form["password"]
 
-        user = await AuthService.authenticate_user(email, password)
+        async with async_session_maker() as session:
+            user = await AuthService.authenticate_user(session, email, password)
         if user and user.is_superuser is True:
-            access_token = AuthService._create_access_token(user.id)
+            access_token = AuthService._create_access_token(user)
             request.session.update({"admin_token": access_token})
 
         return True
@@ -30,7 +32,8 @@ class AdminAuth(AuthenticationBackend):
         if not token:
             return RedirectResponse(request.url_for("admin:login"), status_code=302)
 
-        user = await get_current_user(token)
+        async with async_session_maker() as session:
+            user = await get_current_user(token, session)
         if not user:
             return RedirectResponse(request.url_for("admin:login"), status_code=302)
 
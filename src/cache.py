@@ -0,0 +1,82 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+KeyType = TypeVar("KeyType", bound=Hashable)
+ValueType = TypeVar("ValueType")
+
+
+class LRUCache(Generic[KeyType, ValueType]):
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[ValueType], int]] = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[KeyType, Tuple[float, ValueType]]" = OrderedDict()
+
+    def get(self, key: KeyType) -> Optional[ValueType]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self.invalidate(key)
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: KeyType, value: ValueType) -> None:
+        if self.max_bytes is not None and self._sizeof(value) > self.max_bytes:
+            return
+
+        self.invalidate(key)
+        expires_at = time.monotonic() + self.ttl if self.ttl else float("inf")
+        self._data[key] = (expires_at, value)
+        self.bytes += self._sizeof(value)
+        while len(self._data) > self.maxsize or (
+            self.max_bytes is not None and self.bytes > self.max_bytes
+        ):
+            _, (_, evicted) = self._data.popitem(last=False)
+            self.bytes -= self._sizeof(evicted)
+
+    def invalidate(self, key: KeyType) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= self._sizeof(entry[1])
+
+    def invalidate_where(self, predicate: Callable[[KeyType], bool]) -> None:
+        for key in [key for key in self._data if predicate(key)]:
+            self.invalidate(key)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.bytes = 0
+
+    def _sizeof(self, value: ValueType) -> int:
+        return self.sizeof(value) if self.sizeof else 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
@@ -5,6 +5,7 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     app_name: str = "local_forms"
+    FRONTEND_URL: str = "http://127.0.0.1:3000"
 
     MODE: Literal["DEV", "TEST", "PROD"]
     LOG_LEVEL: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
@@ -44,6 +45,36 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
 
+    USER_CACHE_MAXSIZE: int = 1024
+    USER_CACHE_TTL_SECONDS: int = 60
+
+    STATELESS_AUTH: bool = False
+    TOKEN_EPOCH_TTL_SECONDS: int = 30
+
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
+
+    REFRESH_SESSION_SWEEPER_ENABLED: bool = True
+    REFRESH_SESSION_SWEEP_INTERVAL_SECONDS: int = 300
+    REFRESH_SESSION_SWEEP_BUDGET_SECONDS: int = 10
+    REFRESH_SESSION_SWEEP_BATCH_SIZE: int = 500
+    REFRESH_SESSION_SWEEP_BATCH_TIMEOUT_MS: int = 2000
+    MAX_REFRESH_SESSIONS_PER_USER: int = 10
+
+    FORM_CACHE_MAXSIZE: int = 1024
+    FORM_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    ANSWER_VALIDATOR_CACHE_MAXSIZE: int = 1024
+
+    REVIEW_GROUP_COMMIT: bool = False
+    REVIEW_GROUP_COMMIT_BATCH_SIZE: int = 100
+    REVIEW_GROUP_COMMIT_MAX_LATENCY_MS: int = 10
+    REVIEW_GROUP_COMMIT_QUEUE_SIZE: int = 10000
+
+    RESULT_STATS_FOLDER_ENABLED: bool = True
+    RESULT_STATS_FOLD_INTERVAL_SECONDS: int = 2
+    RESULT_STATS_FOLD_BUDGET_SECONDS: int = 10
+    RESULT_STATS_FOLD_BATCH_SIZE: int = 10000
+
     model_config = SettingsConfigDict(env_file=".env", extra="allow")
 
 
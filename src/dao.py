@@ -1,13 +1,15 @@
-from typing import Any, Dict, Generic, List, Optional, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar, Union
 
 from pydantic import BaseModel
-from sqlalchemy import delete, insert, select, update
+from sqlalchemy import column, delete, insert, literal, select, tuple_, update, values
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 from sqlalchemy.sql import func
 
 from .database import Base
+from .pagination import KeysetPage, decode_cursor, encode_cursor
 
 # from .logger import logger
 
@@ -47,6 +49,58 @@ class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await session.execute(stmt)
         return result.scalars().all()
 
+    @classmethod
+    async def find_page(
+        cls,
+        session: AsyncSession,
+        *filter,
+        order_by: Optional[InstrumentedAttribute] = None,
+        descending: bool = False,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        **filter_by,
+    ) -> KeysetPage:
+        # Keyset pagination over (order_by, id); id breaks ties so the order
+        # is total and a cursor always points between two distinct rows.
+        columns = (cls.model.id,)
+        if order_by is not None and order_by is not cls.model.id:
+            columns = (order_by, cls.model.id)
+
+        backwards = False
+        stmt = select(cls.model).filter(*filter).filter_by(**filter_by)
+        scan_ascending = not descending
+        if cursor is not None:
+            backwards, values = decode_cursor(cursor, columns)
+            scan_ascending = descending == backwards
+            key = tuple_(*columns)
+            position = tuple_(
+                *(literal(value, column.type) for column, value in zip(columns, values))
+            )
+            stmt = stmt.filter(key > position if scan_ascending else key < position)
+
+        stmt = stmt.order_by(
+            *(column.asc() if scan_ascending else column.desc() for column in columns)
+        ).limit(limit + 1)
+        result = await session.execute(stmt)
+        items = list(result.scalars().all())
+
+        has_more = len(items) > limit
+        items = items[:limit]
+        if backwards:
+            items.reverse()
+        if not items:
+            return KeysetPage(items)
+
+        def position_of(item: ModelType) -> tuple:
+            return tuple(getattr(item, column.key) for column in columns)
+
+        next_cursor = prev_cursor = None
+        if has_more or backwards:
+            next_cursor = encode_cursor(False, position_of(items[-1]))
+        if (has_more and backwards) or (cursor is not None and not backwards):
+            prev_cursor = encode_cursor(True, position_of(items[0]))
+        return KeysetPage(items, next_cursor, prev_cursor)
+
     @classmethod
     async def add(
         cls, session: AsyncSession, obj_in: Union[CreateSchemaType, Dict[str, Any]]
@@ -79,46 +133,94 @@ class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         session: AsyncSession,
         *where,
         obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        **scope,
     ) -> Optional[ModelType]:
+        # ``scope`` (e.g. creator_id=user.id) narrows the statement itself, so
+        # access checks cost nothing when they pass. A scoped update returns
+        # None when no row matched instead of raising.
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.model_dump(exclude_unset=True)
 
         stmt = (
-            update(cls.model).where(*where).values(**update_data).returning(cls.model)
+            update(cls.model)
+            .where(*where)
+            .filter_by(**scope)
+            .values(**update_data)
+            .returning(cls.model)
         )
         result = await session.execute(stmt)
+        if scope:
+            return result.scalars().one_or_none()
         return result.scalars().one()
 
     @classmethod
-    async def add_bulk(cls, session: AsyncSession, data: List[Dict[str, Any]]):
-        try:
-            result = await session.execute(insert(cls.model).returning(cls.model), data)
-            return result.scalars().all()
-        except (SQLAlchemyError, Exception) as e:
-            if isinstance(e, SQLAlchemyError):
-                msg = "Database Exc"
-            elif isinstance(e, Exception):
-                msg = "Unknown Exc"
-            msg += ": Cannot bulk insert data into table"
+    async def add_bulk(
+        cls, session: AsyncSession, data: List[Dict[str, Any]]
+    ) -> List[ModelType]:
+        # Errors are not swallowed here: a failed batch aborts the
+        # transaction, and the rows come back in the order of ``data``.
+        stmt = insert(cls.model).returning(cls.model, sort_by_parameter_order=True)
+        result = await session.execute(stmt, data)
+        return result.scalars().all()
 
-            # logger.error(msg, extra={"table": cls.model.__tablename__}, exc_info=True)
-            return None
+    @classmethod
+    async def upsert(
+        cls,
+        session: AsyncSession,
+        data: List[Dict[str, Any]],
+        index_elements: Sequence[str],
+        update_fields: Optional[Sequence[str]] = None,
+    ) -> List[ModelType]:
+        # INSERT ... ON CONFLICT in one statement. Without ``update_fields``
+        # conflicting rows are skipped and only the inserted ones come back;
+        # the returned rows are in no particular order.
+        stmt = postgresql.insert(cls.model).values(data)
+        if update_fields:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=index_elements,
+                set_={name: stmt.excluded[name] for name in update_fields},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+        result = await session.execute(stmt.returning(cls.model))
+        return result.scalars().all()
 
     @classmethod
-    async def update_bulk(cls, session: AsyncSession, data: List[Dict[str, Any]]):
-        try:
-            stmt = update(cls.model)
-            await session.execute(update(cls.model), data)
-        except (SQLAlchemyError, Exception) as e:
-            if isinstance(e, SQLAlchemyError):
-                msg = "Database Exc"
-            elif isinstance(e, Exception):
-                msg = "Unknown Exc"
-            msg += ": Cannot bulk update data into table"
-            # logger.error(msg, extra={"table": cls.model.__tablename__}, exc_info=True)
-            return None
+    async def update_bulk(
+        cls, session: AsyncSession, data: List[Dict[str, Any]]
+    ) -> List[ModelType]:
+        # Every dict carries the primary key the row is updated by. Rows that
+        # change the same columns share one UPDATE ... FROM (VALUES ...), and
+        # the rows come back as written, in no particular order.
+        table = cls.model.__table__
+        [primary_key] = table.primary_key.columns
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in data:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+
+        updated = []
+        for names, rows in groups.items():
+            changes = values(
+                *(column(name, table.c[name].type) for name in names), name="changes"
+            ).data([tuple(row[name] for name in names) for row in rows])
+            stmt = (
+                update(cls.model)
+                .where(primary_key == changes.c[primary_key.name])
+                .values(
+                    {
+                        name: changes.c[name]
+                        for name in names
+                        if name != primary_key.name
+                    }
+                )
+                .returning(cls.model)
+                .execution_options(synchronize_session=False)
+            )
+            result = await session.execute(stmt)
+            updated.extend(result.scalars().all())
+        return updated
 
     @classmethod
     async def count(cls, session: AsyncSession, *filter, **filter_by):
@@ -1,8 +1,9 @@
 from typing import AsyncGenerator
 
-from sqlalchemy import NullPool
+from sqlalchemy import NullPool, select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.sql import func
 
 from .config import settings
 
@@ -26,3 +27,8 @@ async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         yield session
+
+
+async def try_advisory_xact_lock(session: AsyncSession, key: int) -> bool:
+    result = await session.execute(select(func.pg_try_advisory_xact_lock(key)))
+    return result.scalar()
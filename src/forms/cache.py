@@ -0,0 +1,53 @@
+import uuid
+from typing import Optional, Tuple
+
+from ..cache import LRUCache
+from ..config import settings
+from ..metrics import register_collector
+
+# Keyed by (form id, version, creator id): an edit made by another worker, or
+# a creator change caused by a user delete, turns into a miss because the
+# lookup key is read from the form row first.
+FormDocumentKey = Tuple[int, int, Optional[uuid.UUID]]
+
+form_document_cache: LRUCache[FormDocumentKey, bytes] = LRUCache(
+    maxsize=settings.FORM_CACHE_MAXSIZE,
+    max_bytes=settings.FORM_CACHE_MAX_BYTES,
+    sizeof=len,
+)
+
+register_collector("form_document_cache", form_document_cache.stats)
+
+
+def get_form_document(
+    form_id: int, version: int, creator_id: Optional[uuid.UUID]
+) -> Optional[bytes]:
+    return form_document_cache.get((form_id, version, creator_id))
+
+
+def set_form_document(
+    form_id: int, version: int, creator_id: Optional[uuid.UUID], document: bytes
+) -> None:
+    form_document_cache.set((form_id, version, creator_id), document)
+
+
+def invalidate_form_document(form_id: int) -> None:
+    form_document_cache.invalidate_where(lambda key: key[0] == form_id)
+
+
+# Snapshots never change, so entries only leave the cache through eviction.
+form_snapshot_cache: LRUCache[Tuple[int, int], bytes] = LRUCache(
+    maxsize=settings.FORM_CACHE_MAXSIZE,
+    max_bytes=settings.FORM_CACHE_MAX_BYTES,
+    sizeof=len,
+)
+
+register_collector("form_snapshot_cache", form_snapshot_cache.stats)
+
+
+def get_form_snapshot(form_id: int, version: int) -> Optional[bytes]:
+    return form_snapshot_cache.get((form_id, version))
+
+
+def set_form_snapshot(form_id: int, version: int, document: bytes) -> None:
+    form_snapshot_cache.set((form_id, version), document)
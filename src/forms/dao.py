@@ -1,13 +1,28 @@
-from typing import Optional
+import uuid
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Text,
+    cast,
+    false,
+    insert,
+    literal,
+    literal_column,
+    select,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, subqueryload, with_expression
+from sqlalchemy.sql import func
 
+from ..config import settings
 from ..dao import BaseDAO
-from .models import FormModel, ItemModel, OptionModel
+from .models import FormModel, FormSnapshotModel, ItemModel, OptionModel
 from .schemas import (
     FormCreate,
+    FormSnapshot,
     FormUpdate,
     ItemCreate,
     ItemUpdate,
@@ -19,21 +34,358 @@ from .schemas import (
 class OptionDAO(BaseDAO[OptionModel, OptionCreate, OptionUpdate]):
     model = OptionModel
 
+    @classmethod
+    async def find_item_ids(
+        cls, session: AsyncSession, form_id: int
+    ) -> List[Tuple[int, int]]:
+        # (option id, item id) for every option of the form.
+        stmt = (
+            select(OptionModel.id, OptionModel.item_id)
+            .join(ItemModel, ItemModel.id == OptionModel.item_id)
+            .where(ItemModel.form_id == form_id)
+        )
+        result = await session.execute(stmt)
+        return result.all()
+
 
 class ItemDAO(BaseDAO[ItemModel, ItemCreate, ItemUpdate]):
     model = ItemModel
 
+    @classmethod
+    async def find_order_keys(
+        cls, session: AsyncSession, form_id: int
+    ) -> List[Tuple[int, int]]:
+        # (item id, order key) for every item of the form, in display order.
+        stmt = (
+            select(ItemModel.id, ItemModel.order_key)
+            .where(ItemModel.form_id == form_id)
+            .order_by(ItemModel.order_key, ItemModel.id)
+        )
+        result = await session.execute(stmt)
+        return result.all()
+
 
 class FormDAO(BaseDAO[FormModel, FormCreate, FormUpdate]):
     model = FormModel
 
+    @classmethod
+    def _next_id(cls):
+        return select(
+            func.nextval(
+                func.pg_get_serial_sequence(FormModel.__tablename__, "id")
+            ).label("id")
+        ).cte("new_form_id")
+
+    @classmethod
+    def _link(cls, id):
+        return func.concat(f"{settings.FRONTEND_URL}/forms/", id)
+
+    @classmethod
+    async def add_with_link(
+        cls, session: AsyncSession, obj_in: Union[FormCreate, Dict[str, Any]]
+    ) -> FormModel:
+        # The id is taken from the sequence first so the link can be built
+        # in the same INSERT.
+        if isinstance(obj_in, dict):
+            create_data = obj_in
+        else:
+            create_data = obj_in.model_dump(exclude_unset=True)
+        columns = FormModel.__table__.c
+        new_id = cls._next_id()
+        stmt = (
+            insert(FormModel)
+            .from_select(
+                ["id", "link", *create_data],
+                select(
+                    new_id.c.id,
+                    cls._link(new_id.c.id),
+                    *(
+                        literal(value, columns[name].type)
+                        for name, value in create_data.items()
+                    ),
+                ),
+            )
+            .returning(FormModel)
+        )
+        result = await session.execute(stmt)
+        return result.scalars().one()
+
+    @classmethod
+    async def find_version(
+        cls, session: AsyncSession, id: int
+    ) -> Optional[Tuple[int, Optional[uuid.UUID]]]:
+        stmt = select(FormModel.version, FormModel.creator_id).where(FormModel.id == id)
+        result = await session.execute(stmt)
+        return result.one_or_none()
+
+    @classmethod
+    async def bump_version(
+        cls,
+        session: AsyncSession,
+        id: int,
+        versions: Optional[Set[int]] = None,
+        creator_id: Optional[uuid.UUID] = None,
+    ) -> Optional[int]:
+        # With ``versions`` this is a compare-and-set: concurrent writers
+        # queue on the row lock and all but the first see a changed version.
+        stmt = (
+            update(FormModel)
+            .where(FormModel.id == id)
+            .values(version=FormModel.version + 1)
+            .returning(FormModel.version)
+            .execution_options(synchronize_session=False)
+        )
+        if versions is not None:
+            stmt = stmt.where(FormModel.version.in_(versions))
+        if creator_id is not None:
+            stmt = stmt.where(FormModel.creator_id == creator_id)
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @classmethod
+    async def find_document(
+        cls, session: AsyncSession, id: int
+    ) -> Optional[Tuple[str, int, Optional[uuid.UUID]]]:
+        # Renders the ``Form`` document as JSON inside Postgres, together
+        # with the version and creator it was built from.
+        stmt = select(
+            cast(cls._document(id), Text), FormModel.version, FormModel.creator_id
+        ).where(FormModel.id == id)
+        result = await session.execute(stmt)
+        return result.one_or_none()
+
+    @classmethod
+    def _document(cls, id: int):
+        empty = literal_column("'[]'::json")
+        items = (
+            select(
+                ItemModel.id,
+                ItemModel.title,
+                ItemModel.description,
+                ItemModel.item_type,
+                ItemModel.required,
+                ItemModel.form_id,
+                ItemModel.position().label("item_order"),
+            )
+            .where(ItemModel.form_id == id)
+            .subquery("items")
+        )
+        options = (
+            select(
+                func.coalesce(
+                    func.json_agg(
+                        aggregate_order_by(
+                            func.json_build_object(
+                                "title",
+                                OptionModel.title,
+                                "id",
+                                OptionModel.id,
+                                "item_id",
+                                OptionModel.item_id,
+                            ),
+                            OptionModel.id,
+                        )
+                    ),
+                    empty,
+                )
+            )
+            .where(OptionModel.item_id == items.c.id)
+            .scalar_subquery()
+        )
+        items_json = (
+            select(
+                func.coalesce(
+                    func.json_agg(
+                        aggregate_order_by(
+                            func.json_build_object(
+                                "title",
+                                items.c.title,
+                                "description",
+                                items.c.description,
+                                "item_type",
+                                items.c.item_type,
+                                "required",
+                                items.c.required,
+                                "id",
+                                items.c.id,
+                                "item_order",
+                                items.c.item_order,
+                                "form_id",
+                                items.c.form_id,
+                                "options",
+                                options,
+                            ),
+                            items.c.item_order,
+                        )
+                    ),
+                    empty,
+                )
+            )
+            .select_from(items)
+            .scalar_subquery()
+        )
+        return func.json_build_object(
+            "title",
+            FormModel.title,
+            "description",
+            FormModel.description,
+            "is_template",
+            FormModel.is_template,
+            "organization",
+            FormModel.organization,
+            "color",
+            FormModel.color,
+            "link",
+            FormModel.link,
+            "creator_id",
+            FormModel.creator_id,
+            "id",
+            FormModel.id,
+            "created_at",
+            FormModel.created_at,
+            "items",
+            items_json,
+        )
+
+    @classmethod
+    async def find_published_version(
+        cls, session: AsyncSession, id: int
+    ) -> Optional[int]:
+        stmt = select(FormModel.published_version).where(FormModel.id == id)
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
     @classmethod
     async def find_form(cls, session: AsyncSession, id: int) -> Optional[FormModel]:
         stmt = (
             select(FormModel)
-            .options(selectinload(FormModel.items).subqueryload(ItemModel.options))
+            .options(
+                selectinload(FormModel.items).options(
+                    with_expression(ItemModel.item_order, ItemModel.position()),
+                    subqueryload(ItemModel.options),
+                )
+            )
             .filter(FormModel.id == id)
+            .execution_options(populate_existing=True)
         )
 
         res = await session.execute(stmt)
         return res.scalars().one_or_none()
+
+    @classmethod
+    async def clone(
+        cls, session: AsyncSession, id: int, creator_id: uuid.UUID
+    ) -> Optional[int]:
+        # Copies the form, its items and their options in one statement.
+        # Item ids are drawn from the sequence up front so options can be
+        # pointed at the new items without a round trip per item.
+        new_id = cls._next_id()
+        new_form = (
+            insert(FormModel)
+            .from_select(
+                [
+                    "id",
+                    "link",
+                    "title",
+                    "description",
+                    "is_template",
+                    "organization",
+                    "color",
+                    "to_review",
+                    "creator_id",
+                ],
+                select(
+                    new_id.c.id,
+                    cls._link(new_id.c.id),
+                    FormModel.title,
+                    FormModel.description,
+                    false(),
+                    FormModel.organization,
+                    FormModel.color,
+                    false(),
+                    literal(creator_id, FormModel.creator_id.type),
+                ).where(FormModel.id == id),
+            )
+            .returning(FormModel.id)
+            .cte("new_form")
+        )
+        item_map = (
+            select(
+                ItemModel.id.label("old_id"),
+                func.nextval(
+                    func.pg_get_serial_sequence(ItemModel.__tablename__, "id")
+                ).label("new_id"),
+            )
+            .where(ItemModel.form_id == id)
+            .cte("item_map")
+        )
+        new_items = insert(ItemModel).from_select(
+            [
+                "id",
+                "title",
+                "description",
+                "item_type",
+                "order_key",
+                "required",
+                "form_id",
+            ],
+            select(
+                item_map.c.new_id,
+                ItemModel.title,
+                ItemModel.description,
+                ItemModel.item_type,
+                ItemModel.order_key,
+                ItemModel.required,
+                new_form.c.id,
+            )
+            .select_from(ItemModel)
+            .join(item_map, ItemModel.id == item_map.c.old_id)
+            .join(new_form, true()),
+        )
+        new_options = insert(OptionModel).from_select(
+            ["title", "item_id"],
+            select(OptionModel.title, item_map.c.new_id)
+            .select_from(OptionModel)
+            .join(item_map, OptionModel.item_id == item_map.c.old_id),
+        )
+        stmt = select(new_form.c.id).add_cte(
+            new_items.cte("new_items"), new_options.cte("new_options")
+        )
+
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+
+class FormSnapshotDAO(BaseDAO[FormSnapshotModel, FormSnapshot, FormSnapshot]):
+    model = FormSnapshotModel
+
+    @classmethod
+    async def publish(cls, session: AsyncSession, form_id: int) -> Tuple[int, str]:
+        # Stores the form's current version as rendered by
+        # FormDAO.find_document and returns it.
+        stmt = (
+            insert(FormSnapshotModel)
+            .from_select(
+                ["form_id", "version", "document"],
+                select(
+                    FormModel.id,
+                    FormModel.version,
+                    cast(FormDAO._document(form_id), JSONB),
+                ).where(FormModel.id == form_id),
+            )
+            .returning(
+                FormSnapshotModel.version, cast(FormSnapshotModel.document, Text)
+            )
+        )
+        result = await session.execute(stmt)
+        return result.one()
+
+    @classmethod
+    async def find_document(
+        cls, session: AsyncSession, form_id: int, version: int
+    ) -> Optional[str]:
+        stmt = select(cast(FormSnapshotModel.document, Text)).where(
+            FormSnapshotModel.form_id == form_id, FormSnapshotModel.version == version
+        )
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
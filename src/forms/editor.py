@@ -0,0 +1,298 @@
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .dao import FormDAO, ItemDAO, OptionDAO
+from .models import FormModel, ItemModel, OptionModel
+from .schemas import (
+    CreateItemRequest,
+    CreateOptionRequest,
+    DeleteItemRequest,
+    DeleteOptionRequest,
+    FormDelta,
+    FormWithoutItems,
+    Item,
+    ItemPosition,
+    ItemWithoutOptions,
+    MoveItemRequest,
+    Option,
+    UpdateFormRequest,
+    UpdateItemRequest,
+    UpdateOptionRequest,
+    UpdateRequest,
+)
+from .utils import ORDER_KEY_GAP, order_keys_between
+
+
+class EditedItem:
+    def __init__(
+        self,
+        id: Optional[int],
+        order_key: Optional[int],
+        position: Optional[int] = None,
+    ):
+        # ``id`` is None for items created in this save. ``order_key`` is None
+        # while the item still needs a key at its new position. ``position``
+        # is the 1-based item_order the item had before the save.
+        self.id = id
+        self.order_key = order_key
+        self.original_order_key = order_key
+        self.original_position = position
+        self.values: Dict[str, Any] = {}
+
+
+class FormEditor:
+    # Applies a whole save from the editor to the form's item and option state
+    # in memory, then writes the difference with one statement per kind of
+    # change: deletes, bulk inserts and bulk updates by primary key.
+    def __init__(self, form_id: int):
+        self.form_id = form_id
+        self.form_values: Dict[str, Any] = {}
+        self.items: List[EditedItem] = []
+        self.items_by_id: Dict[int, EditedItem] = {}
+        self.deleted_item_ids: List[int] = []
+        # option id -> item id for the options that still exist
+        self.options: Dict[int, int] = {}
+        self.option_values: Dict[int, Dict[str, Any]] = {}
+        self.new_options: List[Dict[str, Any]] = []
+        self.deleted_option_ids: List[int] = []
+        # Rows returned by the writes, for FormEditor.delta.
+        self.updated_form: Optional[FormModel] = None
+        self.created_items: List[Item] = []
+        self.updated_items: List[ItemModel] = []
+        self.created_options: List[OptionModel] = []
+        self.updated_options: List[OptionModel] = []
+
+    async def load(
+        self, session: AsyncSession, with_items: bool = True, with_options: bool = True
+    ) -> None:
+        if with_items:
+            rows = await ItemDAO.find_order_keys(session, self.form_id)
+            for position, (id, order_key) in enumerate(rows, start=1):
+                item = EditedItem(id, order_key, position)
+                self.items.append(item)
+                self.items_by_id[id] = item
+        if with_options:
+            self.options = dict(await OptionDAO.find_item_ids(session, self.form_id))
+
+    def apply(self, request: UpdateRequest) -> None:
+        self.operations[request.op](self, request)
+
+    async def flush(self, session: AsyncSession) -> None:
+        if self.form_values:
+            self.updated_form = await FormDAO.update(
+                session, FormModel.id == self.form_id, obj_in=self.form_values
+            )
+        if self.deleted_item_ids:
+            # Options of these items go with them through ON DELETE CASCADE.
+            await ItemDAO.delete(
+                session,
+                ItemModel.id.in_(self.deleted_item_ids),
+                form_id=self.form_id,
+            )
+        if self.deleted_option_ids:
+            await OptionDAO.delete(session, OptionModel.id.in_(self.deleted_option_ids))
+
+        self._assign_order_keys()
+        new_items = []
+        new_item_positions = []
+        changed_items = []
+        for position, item in enumerate(self.items, start=1):
+            values = dict(item.values)
+            if item.order_key != item.original_order_key:
+                values["order_key"] = item.order_key
+            if item.id is None:
+                new_items.append(values)
+                new_item_positions.append(position)
+            elif values:
+                changed_items.append({"id": item.id, **values})
+        if new_items:
+            rows = await ItemDAO.add_bulk(session, new_items)
+            self.created_items = [
+                Item(
+                    id=row.id,
+                    title=row.title,
+                    description=row.description,
+                    item_type=row.item_type,
+                    item_order=position,
+                    required=row.required,
+                    form_id=row.form_id,
+                )
+                for row, position in zip(rows, new_item_positions)
+            ]
+        if changed_items:
+            self.updated_items = await ItemDAO.update_bulk(session, changed_items)
+
+        if self.new_options:
+            self.created_options = await OptionDAO.add_bulk(session, self.new_options)
+        if self.option_values:
+            self.updated_options = await OptionDAO.update_bulk(
+                session,
+                [{"id": id, **values} for id, values in self.option_values.items()],
+            )
+
+    def delta(self, version: int) -> FormDelta:
+        positions = {
+            item.id: position
+            for position, item in enumerate(self.items, start=1)
+            if item.id is not None
+        }
+        # Rows returned by the update; items whose only change was a new
+        # order key are reported as moved like any other shifted item.
+        updated_items = [
+            ItemWithoutOptions(
+                id=row.id,
+                title=row.title,
+                description=row.description,
+                item_type=row.item_type,
+                item_order=positions[row.id],
+                required=row.required,
+                form_id=row.form_id,
+            )
+            for row in self.updated_items
+            if self.items_by_id[row.id].values
+        ]
+        updated_ids = {item.id for item in updated_items}
+        moved_items = [
+            ItemPosition(id=id, item_order=position)
+            for id, position in positions.items()
+            if id not in updated_ids
+            and position != self.items_by_id[id].original_position
+        ]
+
+        return FormDelta(
+            version=version,
+            form=(
+                FormWithoutItems.model_validate(self.updated_form)
+                if self.updated_form is not None
+                else None
+            ),
+            createdItems=self.created_items,
+            updatedItems=sorted(updated_items, key=lambda item: item.item_order),
+            movedItems=moved_items,
+            deletedItemIds=self.deleted_item_ids,
+            createdOptions=[
+                Option.model_validate(option) for option in self.created_options
+            ],
+            updatedOptions=[
+                Option.model_validate(option) for option in self.updated_options
+            ],
+            deletedOptionIds=self.deleted_option_ids,
+        )
+
+    def _update_form(self, request: UpdateFormRequest) -> None:
+        self.form_values.update(request.updateForm.model_dump(exclude_unset=True))
+
+    def _create_item(self, request: CreateItemRequest) -> None:
+        schema = request.createItem
+        item = EditedItem(None, None)
+        item.values = {
+            **schema.model_dump(exclude={"item_order", "form_id"}),
+            "form_id": self.form_id,
+        }
+        self.items.insert(max(schema.item_order - 1, 0), item)
+
+    def _move_item(self, request: MoveItemRequest) -> None:
+        schema = request.moveItem
+        if schema.new_location == schema.original_location:
+            return
+
+        index = schema.original_location - 1
+        if not 0 <= index < len(self.items):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"item with location={schema.original_location} in form with id={self.form_id} not found",
+            )
+        item = self.items.pop(index)
+        item.order_key = None
+        self.items.insert(max(schema.new_location - 1, 0), item)
+
+    def _delete_item(self, request: DeleteItemRequest) -> None:
+        item = self.items_by_id.pop(request.deleteItem.id, None)
+        if item is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Wrong data"
+            )
+        self.items.remove(item)
+        self.deleted_item_ids.append(item.id)
+
+        option_ids = [id for id, item_id in self.options.items() if item_id == item.id]
+        for id in option_ids:
+            del self.options[id]
+            self.option_values.pop(id, None)
+        self.new_options = [
+            option for option in self.new_options if option["item_id"] != item.id
+        ]
+
+    def _update_item(self, request: UpdateItemRequest) -> None:
+        item = self._get_item(request.updateItem.item_id)
+        item.values.update(request.updateItem.item.model_dump(exclude_unset=True))
+
+    def _create_option(self, request: CreateOptionRequest) -> None:
+        self._get_item(request.createOption.item_id)
+        self.new_options.append(request.createOption.model_dump())
+
+    def _delete_option(self, request: DeleteOptionRequest) -> None:
+        self._get_option(request.deleteOptionId)
+        del self.options[request.deleteOptionId]
+        self.option_values.pop(request.deleteOptionId, None)
+        self.deleted_option_ids.append(request.deleteOptionId)
+
+    def _update_option(self, request: UpdateOptionRequest) -> None:
+        self._get_option(request.updateOption.option_id)
+        self.option_values.setdefault(request.updateOption.option_id, {}).update(
+            request.updateOption.option.model_dump(exclude_unset=True)
+        )
+
+    def _assign_order_keys(self) -> None:
+        # Items that kept their key stay in increasing order, so only runs of
+        # new or moved items need keys between their neighbours. When a gap
+        # is used up the whole form is respaced once.
+        index = 0
+        while index < len(self.items):
+            if self.items[index].order_key is not None:
+                index += 1
+                continue
+
+            end = index
+            while end < len(self.items) and self.items[end].order_key is None:
+                end += 1
+            before = self.items[index - 1].order_key if index > 0 else None
+            after = self.items[end].order_key if end < len(self.items) else None
+            keys = order_keys_between(before, after, end - index)
+            if keys is None:
+                for position, item in enumerate(self.items, start=1):
+                    item.order_key = position * ORDER_KEY_GAP
+                return
+
+            for item, key in zip(self.items[index:end], keys):
+                item.order_key = key
+            index = end
+
+    def _get_item(self, id: int) -> EditedItem:
+        item = self.items_by_id.get(id)
+        if item is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"item with id={id} in form with id={self.form_id} not found",
+            )
+        return item
+
+    def _get_option(self, id: int) -> None:
+        if id not in self.options:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"option with id={id} in form with id={self.form_id} not found",
+            )
+
+    operations: Dict[str, Callable[["FormEditor", UpdateRequest], None]] = {
+        "updateForm": _update_form,
+        "createItem": _create_item,
+        "moveItem": _move_item,
+        "deleteItem": _delete_item,
+        "updateItem": _update_item,
+        "createOption": _create_option,
+        "deleteOption": _delete_option,
+        "updateOption": _update_option,
+    }
@@ -1,10 +1,10 @@
 import uuid
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, List, Optional
 
 import sqlalchemy as sa
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column, query_expression, relationship
 from sqlalchemy.sql import func
 
 from ..database import Base
@@ -29,7 +29,9 @@ class ItemModel(Base):
     title: Mapped[Optional[str]]
     description: Mapped[Optional[str]]
     item_type: Mapped[str]
-    item_order: Mapped[int]
+    # Sparse sort key; the dense 1-based position is only loaded on demand.
+    order_key: Mapped[int] = mapped_column(sa.BigInteger)
+    item_order: Mapped[Optional[int]] = query_expression()
     required: Mapped[bool] = mapped_column(default=True)
     form_id: Mapped[int] = mapped_column(
         sa.ForeignKey("form.id", ondelete="CASCADE"), nullable=False
@@ -40,6 +42,14 @@ class ItemModel(Base):
         uselist=True, back_populates="item"
     )
 
+    __table_args__ = (sa.Index("ix_item_form_id_order_key", "form_id", "order_key"),)
+
+    @classmethod
+    def position(cls):
+        return sa.func.row_number().over(
+            partition_by=cls.form_id, order_by=(cls.order_key, cls.id)
+        )
+
 
 class FormModel(Base):
     __tablename__ = "form"
@@ -55,11 +65,34 @@ class FormModel(Base):
         sa.TIMESTAMP(timezone=True), server_default=func.now()
     )
     link: Mapped[Optional[str]]
+    # Bumped by every edit; identifies the cached form document.
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
+    published_version: Mapped[Optional[int]]
     creator_id: Mapped[uuid.UUID] = mapped_column(
         UUID, sa.ForeignKey("user.id", ondelete="SET NULL"), nullable=False
     )
 
-    items: Mapped[List[ItemModel]] = relationship(uselist=True, back_populates="form")
+    items: Mapped[List[ItemModel]] = relationship(
+        uselist=True,
+        back_populates="form",
+        order_by=[ItemModel.order_key, ItemModel.id],
+    )
+
+    __table_args__ = (sa.Index("ix_form_created_at_id", "created_at", "id"),)
+
+
+class FormSnapshotModel(Base):
+    # Rendered form document as published; rows are never updated.
+    __tablename__ = "form_snapshot"
+
+    form_id: Mapped[int] = mapped_column(
+        sa.ForeignKey("form.id", ondelete="CASCADE"), primary_key=True
+    )
+    version: Mapped[int] = mapped_column(primary_key=True)
+    document: Mapped[dict[str, Any]] = mapped_column(JSONB)
+    published_at: Mapped[datetime] = mapped_column(
+        sa.TIMESTAMP(timezone=True), server_default=func.now()
+    )
 
 
 # class Question(Base):
@@ -0,0 +1,27 @@
+from typing import Optional, Tuple
+
+from ...cache import LRUCache
+from ...config import settings
+from ...metrics import register_collector
+from .validation import FormAnswerValidator
+
+# Keyed by (form id, published version); snapshots never change, so an entry
+# is only dropped once a newer version of the same form is compiled.
+answer_validator_cache: LRUCache[Tuple[int, int], FormAnswerValidator] = LRUCache(
+    maxsize=settings.ANSWER_VALIDATOR_CACHE_MAXSIZE
+)
+
+register_collector("answer_validator_cache", answer_validator_cache.stats)
+
+
+def get_answer_validator(form_id: int, version: int) -> Optional[FormAnswerValidator]:
+    return answer_validator_cache.get((form_id, version))
+
+
+def set_answer_validator(
+    form_id: int, version: int, validator: FormAnswerValidator
+) -> None:
+    answer_validator_cache.invalidate_where(
+        lambda key: key[0] == form_id and key[1] != version
+    )
+    answer_validator_cache.set((form_id, version), validator)
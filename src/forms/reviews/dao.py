@@ -1,11 +1,175 @@
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from ...dao import BaseDAO
-from .models import AnswerModel, ReviewModel
-from .schemas import AnswerCreate, AnswerUpdate, ReviewCreate, ReviewUpdate
+from .models import (
+    AnswerModel,
+    FormItemStatsDeltaModel,
+    FormItemStatsModel,
+    ReviewModel,
+)
+from .results import ResultCounts, merge_counts
+from .schemas import (
+    Answer,
+    AnswerCreate,
+    AnswerUpdate,
+    FormItemStats,
+    Review,
+    ReviewCreate,
+    ReviewUpdate,
+)
 
 
 class ReviewDAO(BaseDAO[ReviewModel, ReviewCreate, ReviewUpdate]):
     model = ReviewModel
 
+    @classmethod
+    async def add_with_answers(
+        cls,
+        session: AsyncSession,
+        submissions: List[Tuple[ReviewCreate, List[AnswerCreate], ResultCounts]],
+    ) -> List[Optional[Review]]:
+        # One multi-row INSERT for the reviews, one for all their answers and
+        # one for their result deltas, however many submissions there are.
+        # A submission whose user already reviewed the form is skipped by the
+        # unique index and gets None.
+        rows = await cls.upsert(
+            session,
+            [review.model_dump() for review, _, _ in submissions],
+            index_elements=["form_id", "user_id"],
+        )
+        rows_by_key = {(row.form_id, row.user_id): row for row in rows}
+        reviews = [
+            rows_by_key.pop((review.form_id, review.user_id), None)
+            for review, _, _ in submissions
+        ]
+
+        answer_data = [
+            {**answer.model_dump(), "review_id": review.id}
+            for review, (_, answers, _) in zip(reviews, submissions)
+            if review is not None
+            for answer in answers
+        ]
+        answers_by_review = {review.id: [] for review in reviews if review is not None}
+        if answer_data:
+            for answer in await AnswerDao.add_bulk(session, answer_data):
+                answers_by_review[answer.review_id].append(
+                    Answer.model_validate(answer)
+                )
+        await FormItemStatsDeltaDAO.add_counts(
+            session,
+            merge_counts(
+                (review.form_id, counts)
+                for review, (_, _, counts) in zip(reviews, submissions)
+                if review is not None
+            ),
+        )
+
+        return [
+            Review(
+                id=review.id,
+                form_id=review.form_id,
+                user_id=review.user_id,
+                form_version=review.form_version,
+                review_time=review.review_time,
+                answers=answers_by_review[review.id],
+            )
+            if review is not None
+            else None
+            for review in reviews
+        ]
+
 
 class AnswerDao(BaseDAO[AnswerModel, AnswerCreate, AnswerUpdate]):
     model = AnswerModel
+
+
+class FormItemStatsDAO(BaseDAO[FormItemStatsModel, FormItemStats, FormItemStats]):
+    model = FormItemStatsModel
+
+    @classmethod
+    async def find_by_form(
+        cls, session: AsyncSession, form_id: int
+    ) -> List[FormItemStatsModel]:
+        # A primary key range scan: as many rows as the form has items and
+        # options, whatever the number of reviews.
+        stmt = (
+            select(FormItemStatsModel)
+            .where(FormItemStatsModel.form_id == form_id)
+            .order_by(FormItemStatsModel.item_id, FormItemStatsModel.option_id)
+        )
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
+
+class FormItemStatsDeltaDAO(
+    BaseDAO[FormItemStatsDeltaModel, FormItemStats, FormItemStats]
+):
+    model = FormItemStatsDeltaModel
+
+    @classmethod
+    async def add_counts(
+        cls,
+        session: AsyncSession,
+        counts: Dict[Tuple[int, int, int], Tuple[int, int]],
+    ) -> None:
+        # A plain append: no row is shared with other transactions.
+        if not counts:
+            return
+        await session.execute(
+            insert(FormItemStatsDeltaModel),
+            [
+                {
+                    "form_id": form_id,
+                    "item_id": item_id,
+                    "option_id": option_id,
+                    "answered": answered,
+                    "skipped": skipped,
+                }
+                for (form_id, item_id, option_id), (answered, skipped) in counts.items()
+            ],
+        )
+
+    @classmethod
+    async def fold(cls, session: AsyncSession, limit: int) -> int:
+        # Moves up to ``limit`` of the oldest deltas into form_item_stats in
+        # one statement, summed per aggregate row. Returns how many were
+        # moved.
+        batch_ids = (
+            select(FormItemStatsDeltaModel.id)
+            .order_by(FormItemStatsDeltaModel.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        batch = (
+            delete(FormItemStatsDeltaModel)
+            .where(FormItemStatsDeltaModel.id.in_(batch_ids))
+            .returning(
+                FormItemStatsDeltaModel.form_id,
+                FormItemStatsDeltaModel.item_id,
+                FormItemStatsDeltaModel.option_id,
+                FormItemStatsDeltaModel.answered,
+                FormItemStatsDeltaModel.skipped,
+            )
+            .cte("batch")
+        )
+        keys = (batch.c.form_id, batch.c.item_id, batch.c.option_id)
+        folded = postgresql.insert(FormItemStatsModel).from_select(
+            ["form_id", "item_id", "option_id", "answered", "skipped"],
+            select(*keys, func.sum(batch.c.answered), func.sum(batch.c.skipped))
+            .group_by(*keys)
+            .order_by(*keys),
+        )
+        folded = folded.on_conflict_do_update(
+            index_elements=["form_id", "item_id", "option_id"],
+            set_={
+                "answered": FormItemStatsModel.answered + folded.excluded.answered,
+                "skipped": FormItemStatsModel.skipped + folded.excluded.skipped,
+            },
+        )
+        stmt = select(func.count()).select_from(batch).add_cte(folded.cte("folded"))
+        result = await session.execute(stmt)
+        return result.scalar_one()
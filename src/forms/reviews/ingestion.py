@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from ...config import settings
+from ...database import async_session_maker
+from ...exceptions import ReviewExistsException, ServiceBusyException
+from ...metrics import Histogram, register_collector
+from .dao import ReviewDAO
+from .results import ResultCounts
+from .schemas import AnswerCreate, Review, ReviewCreate
+
+logger = logging.getLogger(__name__)
+
+
+class Submission(NamedTuple):
+    review: ReviewCreate
+    answers: List[AnswerCreate]
+    counts: ResultCounts
+    future: "asyncio.Future[Review]"
+    queued_at: float
+
+
+class ReviewIngestion:
+    # Group commit for validated submissions: a single writer task takes up to
+    # ``batch_size`` of them, or whatever arrived within ``max_latency``
+    # seconds of the first one, and writes them in one transaction.
+    #
+    # Durability: a caller is answered only after its batch has committed, so
+    # an acknowledged review is as durable as with a per-request commit.
+    # Submissions still in the queue when the process dies are lost, but none
+    # of them has been acknowledged. On shutdown the batch in hand and the
+    # queue are written first; a caller whose batch fails gets the error.
+    def __init__(self, batch_size: int, max_latency: float, queue_size: int):
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.queue: "asyncio.Queue[Submission]" = asyncio.Queue(maxsize=queue_size)
+
+        self.batch_sizes = Histogram([1, 2, 5, 10, 20, 50, 100, 200, 500, 1000])
+        self.latencies = Histogram(
+            [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1]
+        )
+        self.failed_batches = 0
+
+    async def submit(
+        self, review: ReviewCreate, answers: List[AnswerCreate], counts: ResultCounts
+    ) -> Review:
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait(
+                Submission(review, answers, counts, future, time.monotonic())
+            )
+        except asyncio.QueueFull:
+            raise ServiceBusyException
+        return await future
+
+    async def run(self) -> None:
+        batch: List[Submission] = []
+        flushing: Optional[Tuple["asyncio.Future[None]", List[Submission]]] = None
+        try:
+            while True:
+                batch.append(await self.queue.get())
+                deadline = time.monotonic() + self.max_latency
+                while len(batch) < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                flushing = asyncio.ensure_future(self.flush(batch)), batch
+                batch = []
+                await self._finish(*flushing)
+                flushing = None
+        except asyncio.CancelledError:
+            # Shutdown: the batch being written is completed, then the one
+            # being collected and whatever is still queued are written too.
+            if flushing is not None:
+                await self._finish(*flushing)
+            while not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            for start in range(0, len(batch), self.batch_size):
+                chunk = batch[start : start + self.batch_size]
+                await self._finish(asyncio.ensure_future(self.flush(chunk)), chunk)
+            raise
+
+    async def _finish(
+        self, flushing: "asyncio.Future[None]", batch: List[Submission]
+    ) -> None:
+        # Shielded so a cancellation cannot cut a batch's transaction short.
+        # If the flush itself fails, no caller of the batch is left waiting.
+        try:
+            await asyncio.shield(flushing)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Review batch could not be written")
+            for submission in batch:
+                if not submission.future.done():
+                    submission.future.set_exception(e)
+
+    async def flush(self, batch: List[Submission]) -> None:
+        self.batch_sizes.observe(len(batch))
+        try:
+            async with async_session_maker() as session:
+                reviews = await ReviewDAO.add_with_answers(
+                    session,
+                    [
+                        (submission.review, submission.answers, submission.counts)
+                        for submission in batch
+                    ],
+                )
+                await session.commit()
+        except Exception:
+            # One bad submission must not fail the others: retry one by one.
+            self.failed_batches += 1
+            logger.exception("Review batch failed, writing submissions one by one")
+            for submission in batch:
+                await self._flush_one(submission)
+            return
+
+        for submission, review in zip(batch, reviews):
+            self._resolve(submission, review)
+
+    async def _flush_one(self, submission: Submission) -> None:
+        try:
+            async with async_session_maker() as session:
+                [review] = await ReviewDAO.add_with_answers(
+                    session,
+                    [(submission.review, submission.answers, submission.counts)],
+                )
+                await session.commit()
+        except Exception as e:
+            if not submission.future.done():
+                submission.future.set_exception(e)
+            return
+        self._resolve(submission, review)
+
+    def _resolve(self, submission: Submission, review: Optional[Review]) -> None:
+        self.latencies.observe(time.monotonic() - submission.queued_at)
+        # The caller may have gone away; the review is stored regardless.
+        if submission.future.done():
+            return
+        if review is None:
+            submission.future.set_exception(ReviewExistsException())
+        else:
+            submission.future.set_result(review)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queue.qsize(),
+            "failed_batches": self.failed_batches,
+            "batch_size": self.batch_sizes.stats(),
+            "latency_seconds": self.latencies.stats(),
+        }
+
+
+review_ingestion = ReviewIngestion(
+    batch_size=settings.REVIEW_GROUP_COMMIT_BATCH_SIZE,
+    max_latency=settings.REVIEW_GROUP_COMMIT_MAX_LATENCY_MS / 1000,
+    queue_size=settings.REVIEW_GROUP_COMMIT_QUEUE_SIZE,
+)
+
+register_collector("review_ingestion", review_ingestion.stats)
@@ -0,0 +1,28 @@
+from typing import List, Tuple
+
+from ...config import settings
+from ...maintenance import Batch, BatchedJob
+from ...metrics import register_collector
+from .dao import FormItemStatsDeltaDAO
+
+
+class ResultStatsFolder(BatchedJob):
+    # Folds the deltas written with each review into form_item_stats. A single
+    # writer per interval means one update of a form's aggregate rows for
+    # however many reviews it received, and results lag by at most about
+    # ``interval`` seconds.
+
+    # Shared by every gunicorn worker: only the one holding it folds a batch.
+    lock_id = 0x5E5_F01D
+
+    def _batches(self) -> List[Tuple[str, Batch]]:
+        return [("folded", FormItemStatsDeltaDAO.fold)]
+
+
+result_stats_folder = ResultStatsFolder(
+    interval=settings.RESULT_STATS_FOLD_INTERVAL_SECONDS,
+    budget=settings.RESULT_STATS_FOLD_BUDGET_SECONDS,
+    batch_size=settings.RESULT_STATS_FOLD_BATCH_SIZE,
+)
+
+register_collector("result_stats_folder", result_stats_folder.stats)
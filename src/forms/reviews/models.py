@@ -20,12 +20,18 @@ class ReviewModel(Base):
     user_id: Mapped[uuid.UUID] = mapped_column(
         UUID, sa.ForeignKey("user.id", ondelete="SET NULL"), nullable=False
     )
+    # Published form version the answers were given to.
+    form_version: Mapped[Optional[int]]
     review_time: Mapped[Optional[datetime]] = mapped_column(
         sa.TIMESTAMP(timezone=True), server_default=func.now()
     )
 
     answers: Mapped["AnswerModel"] = relationship(uselist=True, back_populates="review")
 
+    __table_args__ = (
+        sa.Index("uq_review_form_id_user_id", "form_id", "user_id", unique=True),
+    )
+
 
 class AnswerModel(Base):
     __tablename__ = "answer"
@@ -38,3 +44,37 @@ class AnswerModel(Base):
     promt: Mapped[Optional[dict[str, Any]]] = mapped_column(JSON)
 
     review: Mapped[ReviewModel] = relationship(uselist=False, back_populates="answers")
+
+
+class FormItemStatsModel(Base):
+    # Result aggregates of a form, folded from FormItemStatsDeltaModel so
+    # reading them never touches ``answer``. A row counts
+    #   (item_id, 0)          answered and skipped submissions of the item,
+    #   (item_id, option_id)  how often the option was chosen, in ``answered``,
+    #   (0, 0)                all submissions of the form, in ``answered``.
+    __tablename__ = "form_item_stats"
+
+    form_id: Mapped[int] = mapped_column(
+        sa.ForeignKey("form.id", ondelete="CASCADE"), primary_key=True
+    )
+    item_id: Mapped[int] = mapped_column(primary_key=True)
+    option_id: Mapped[int] = mapped_column(primary_key=True)
+    answered: Mapped[int] = mapped_column(default=0, server_default="0")
+    skipped: Mapped[int] = mapped_column(default=0, server_default="0")
+
+
+class FormItemStatsDeltaModel(Base):
+    # Counts of committed reviews not yet folded into ``form_item_stats``.
+    # Reviews only append here, so concurrent submissions to one form never
+    # wait on each other's aggregate rows; ResultStatsFolder moves the deltas
+    # over in the background.
+    __tablename__ = "form_item_stats_delta"
+
+    id: Mapped[int] = mapped_column(sa.BigInteger, primary_key=True)
+    form_id: Mapped[int] = mapped_column(
+        sa.ForeignKey("form.id", ondelete="CASCADE"), nullable=False
+    )
+    item_id: Mapped[int]
+    option_id: Mapped[int]
+    answered: Mapped[int]
+    skipped: Mapped[int]
@@ -0,0 +1,46 @@
+from typing import Dict, Iterable, List, Tuple
+
+from .models import FormItemStatsModel
+from .schemas import FormResults, ItemResults, OptionResults
+
+# (item id, option id) -> (answered, skipped) for one form, keyed as the rows
+# of FormItemStatsModel.
+ResultCounts = Dict[Tuple[int, int], Tuple[int, int]]
+
+RESPONSES = (0, 0)
+
+
+def merge_counts(
+    counts: Iterable[Tuple[int, ResultCounts]]
+) -> Dict[Tuple[int, int, int], Tuple[int, int]]:
+    # Sums the counts of many submissions, possibly to different forms, so
+    # each aggregate row is written once per transaction.
+    merged = {}
+    for form_id, form_counts in counts:
+        for (item_id, option_id), (answered, skipped) in form_counts.items():
+            key = (form_id, item_id, option_id)
+            total_answered, total_skipped = merged.get(key, (0, 0))
+            merged[key] = (total_answered + answered, total_skipped + skipped)
+    return merged
+
+
+def build_results(form_id: int, rows: List[FormItemStatsModel]) -> FormResults:
+    responses = 0
+    items: Dict[int, ItemResults] = {}
+    options: List[FormItemStatsModel] = []
+    for row in rows:
+        if (row.item_id, row.option_id) == RESPONSES:
+            responses = row.answered
+        elif row.option_id == 0:
+            items[row.item_id] = ItemResults(
+                item_id=row.item_id, answered=row.answered, skipped=row.skipped
+            )
+        else:
+            options.append(row)
+    for row in options:
+        item = items.get(row.item_id)
+        if item is not None:
+            item.options.append(
+                OptionResults(option_id=row.option_id, count=row.answered)
+            )
+    return FormResults(form_id=form_id, responses=responses, items=list(items.values()))
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from ...database import get_async_session
 from ...users.dependencies import get_current_active_user, get_current_superuser
 from ...users.models import UserModel
-from .schemas import AnswerCreate, Review, ReviewCreate
+from .schemas import AnswerCreate, FormResults, Review, ReviewCreate
 from .service import ReviewService
 
 reviews_router: APIRouter = APIRouter(prefix="/forms", tags=["reviews"])
@@ -13,8 +15,20 @@ async def post_review(
     form_id: int,
     answers: list[AnswerCreate],
     user: UserModel = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
 ) -> Review:
-    return await ReviewService.create_review(ReviewCreate(form_id, user.id), answers)
+    return await ReviewService.create_review(
+        session, ReviewCreate(form_id=form_id, user_id=user.id), answers
+    )
+
+
+@reviews_router.get("/{form_id}/results")
+async def get_results(
+    form_id: int,
+    user: UserModel = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+) -> FormResults:
+    return await ReviewService.get_results(session, form_id, user)
 
 
 @reviews_router.get("/{form_id}/reviews")
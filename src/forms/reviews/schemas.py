@@ -14,7 +14,9 @@ class TextPrompt(BaseModel):
 
 
 class AnswerBase(BaseModel):
-    promt: Optional[Union[ChoisePrompt, TextPrompt]] = None
+    # TextPrompt goes first: ChoisePrompt has only defaults and would also
+    # accept a text answer, dropping its placeholder.
+    promt: Optional[Union[TextPrompt, ChoisePrompt]] = None
 
 
 class AnswerCreate(AnswerBase):
@@ -29,7 +31,6 @@ class Answer(AnswerBase):
     id: int
     item_id: int
     review_id: int
-    prompt: ChoisePrompt | TextPrompt
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -41,6 +42,7 @@ class ReviewBase(BaseModel):
 class ReviewCreate(ReviewBase):
     form_id: int
     user_id: uuid.UUID
+    form_version: Optional[int] = None
 
 
 class ReviewUpdate(ReviewBase):
@@ -51,7 +53,36 @@ class Review(ReviewBase):
     id: int
     form_id: int
     user_id: uuid.UUID
+    form_version: Optional[int] = None
     review_time: datetime
     answers: List[Answer] = []
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class FormItemStats(BaseModel):
+    form_id: int
+    item_id: int
+    option_id: int
+    answered: int
+    skipped: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OptionResults(BaseModel):
+    option_id: int
+    count: int
+
+
+class ItemResults(BaseModel):
+    item_id: int
+    answered: int
+    skipped: int
+    options: List[OptionResults] = []
+
+
+class FormResults(BaseModel):
+    form_id: int
+    responses: int
+    items: List[ItemResults]
@@ -1,51 +1,93 @@
-import uuid
-from datetime import datetime
 from typing import List
 
 from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...database import AsyncSession, async_session_maker
-from .dao import AnswerDao, ReviewDAO
-from .models import AnswerModel, ReviewModel
-from .schemas import AnswerCreate, ReviewCreate
+from ...config import settings
+from ...exceptions import ReviewExistsException
+from ...users.schemas import Principal
+from ..dao import FormDAO
+from ..service import FormService
+from .cache import get_answer_validator, set_answer_validator
+from .dao import FormItemStatsDAO, ReviewDAO
+from .ingestion import review_ingestion
+from .results import build_results
+from .schemas import AnswerCreate, FormResults, Review, ReviewCreate
+from .validation import FormAnswerValidator
 
 
 class ReviewService:
     @classmethod
     async def create_review(
-        cls, review: ReviewCreate, answers: List[AnswerCreate]
-    ) -> None:
-        async with async_session_maker() as session:
-            review_exist = await ReviewDAO.find_one_or_none(
-                session,
-                ReviewModel.form_id == review.form_id,
-                ReviewModel.user_id == review.user_id,
+        cls, session: AsyncSession, review: ReviewCreate, answers: List[AnswerCreate]
+    ) -> Review:
+        # Respondents answer the published snapshot, not the live form.
+        review.form_version = await FormDAO.find_published_version(
+            session, review.form_id
+        )
+        if review.form_version is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Form is not published"
             )
-            if review_exist:
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT, detail="Review alweady exist"
-                )
 
-            for answer in answers:
-                if cls._is_valid_answer(session):
-                    ...
+        validator = await cls._get_validator(
+            session, review.form_id, review.form_version
+        )
+        error = validator.validate(answers)
+        if error is not None:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=error
+            )
+
+        counts = validator.tally(answers)
+        if settings.REVIEW_GROUP_COMMIT:
+            # The writer takes its connection from the same pool: hand this
+            # request's back instead of holding it while the batch commits.
+            await session.close()
+            return await review_ingestion.submit(review, answers, counts)
+
+        [review_out] = await ReviewDAO.add_with_answers(
+            session, [(review, answers, counts)]
+        )
+        if review_out is None:
+            raise ReviewExistsException
+        await session.commit()
+        return review_out
 
-            review_db = await ReviewDAO.add(session, obj_in=review)
+    @classmethod
+    async def get_results(
+        cls, session: AsyncSession, form_id: int, user: Principal
+    ) -> FormResults:
+        row = await FormDAO.find_version(session, form_id)
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Form with id={form_id} not found",
+            )
+        if row.creator_id != user.id and not user.is_superuser:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
 
-            await session.commit()
+        rows = await FormItemStatsDAO.find_by_form(session, form_id)
+        return build_results(form_id, rows)
 
     @classmethod
-    async def get_review(cls, review_id: int):
-        async with async_session_maker() as session:
-            await session.commit()
+    async def get_review(cls, session: AsyncSession, review_id: int):
+        await session.commit()
 
     @classmethod
-    async def get_list_review(cls, form_id: int):
-        async with async_session_maker() as session:
-            await session.commit()
+    async def get_list_review(cls, session: AsyncSession, form_id: int):
+        await session.commit()
 
     @classmethod
-    async def _is_valid_answer(
-        cls, session: AsyncSession, answer: AnswerCreate
-    ) -> bool:
-        ...
+    async def _get_validator(
+        cls, session: AsyncSession, form_id: int, version: int
+    ) -> FormAnswerValidator:
+        # Compiled from the published snapshot the answers are given to.
+        validator = get_answer_validator(form_id, version)
+        if validator is None:
+            document = await FormService.get_snapshot_document(
+                session, form_id, version
+            )
+            validator = FormAnswerValidator.compile(document)
+            set_answer_validator(form_id, version, validator)
+        return validator
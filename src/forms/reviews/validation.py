@@ -0,0 +1,108 @@
+import json
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from ..enums import ItemType
+from .results import RESPONSES, ResultCounts
+from .schemas import AnswerCreate, ChoisePrompt, TextPrompt
+
+CHOICE_TYPES = {ItemType.ChoiceQuestion, ItemType.MultichoiseQuestion}
+
+
+class FormAnswerValidator:
+    # Everything a submission is checked against, precomputed from one
+    # published form version: item types, the option ids of each choice item
+    # and a bitmap of required items, so a check touches only the answers.
+    __slots__ = ("item_types", "item_bits", "options", "required")
+
+    def __init__(
+        self,
+        item_types: Dict[int, ItemType],
+        item_bits: Dict[int, int],
+        options: Dict[int, FrozenSet[int]],
+        required: int,
+    ):
+        self.item_types = item_types
+        self.item_bits = item_bits
+        self.options = options
+        self.required = required
+
+    @classmethod
+    def compile(cls, document: bytes) -> "FormAnswerValidator":
+        item_types = {}
+        item_bits = {}
+        options = {}
+        required = 0
+        for index, item in enumerate(json.loads(document)["items"]):
+            item_id = item["id"]
+            item_types[item_id] = ItemType(item["item_type"])
+            item_bits[item_id] = 1 << index
+            options[item_id] = frozenset(option["id"] for option in item["options"])
+            if item["required"]:
+                required |= 1 << index
+        return cls(item_types, item_bits, options, required)
+
+    def validate(self, answers: List[AnswerCreate]) -> Optional[str]:
+        # Returns what is wrong with the submission, or None.
+        # ``seen`` catches a second answer to an item even when one of them is
+        # empty; ``answered`` only counts for the required items.
+        seen = 0
+        answered = 0
+        for answer in answers:
+            bit = self.item_bits.get(answer.item_id)
+            if bit is None:
+                return f"item with id={answer.item_id} is not in the form"
+            if seen & bit:
+                return f"item with id={answer.item_id} is answered twice"
+            seen |= bit
+
+            error = self._validate_prompt(answer.item_id, answer.promt)
+            if error is not None:
+                return error
+            if self._is_answered(answer.promt):
+                answered |= bit
+
+        missing = self.required & ~answered
+        if missing:
+            return "required items are not answered"
+        return None
+
+    def tally(self, answers: List[AnswerCreate]) -> ResultCounts:
+        # What a validated submission adds to the form's result aggregates:
+        # every item of this version is either answered or skipped.
+        counts = {RESPONSES: (1, 0)}
+        answered = set()
+        for answer in answers:
+            if not self._is_answered(answer.promt):
+                continue
+            answered.add(answer.item_id)
+            if isinstance(answer.promt, ChoisePrompt):
+                for option_id in answer.promt.options:
+                    counts[(answer.item_id, option_id)] = (1, 0)
+        for item_id in self.item_types:
+            counts[(item_id, 0)] = (1, 0) if item_id in answered else (0, 1)
+        return counts
+
+    def _validate_prompt(self, item_id: int, promt: Any) -> Optional[str]:
+        if promt is None:
+            return None
+
+        item_type = self.item_types[item_id]
+        if item_type in CHOICE_TYPES:
+            if not isinstance(promt, ChoisePrompt):
+                return f"item with id={item_id} expects options"
+            chosen = promt.options or []
+            if item_type == ItemType.ChoiceQuestion and len(chosen) > 1:
+                return f"item with id={item_id} accepts one option"
+            if not self.options[item_id].issuperset(chosen):
+                return f"item with id={item_id} has no such option"
+        elif not isinstance(promt, TextPrompt):
+            return f"item with id={item_id} expects text"
+        return None
+
+    @staticmethod
+    def _is_answered(promt: Any) -> bool:
+        if isinstance(promt, ChoisePrompt):
+            return bool(promt.options)
+        if isinstance(promt, TextPrompt):
+            return bool(promt.placeholder)
+        return False
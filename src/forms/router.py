@@ -1,65 +1,144 @@
-from typing import List, Optional
+from typing import List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..users.dependencies import get_current_superuser
+from ..database import get_async_session
+from ..pagination import Page
+from ..responses import Serializer
+from ..users.dependencies import get_current_active_user, get_current_superuser
 from ..users.models import UserModel
 from ..users.schemas import User
-from .schemas import Form, FormWithoutItems, UpdateSchema
+from .schemas import Form, FormDelta, FormWithoutItems, UpdateSchema
 from .service import FormService
+from .utils import form_etag
 
 forms_router: APIRouter = APIRouter(prefix="/forms", tags=["forms"])
 
+form_serializer = Serializer(Form)
+form_page_serializer = Serializer(Page[FormWithoutItems])
+form_list_serializer = Serializer(List[FormWithoutItems])
+form_delta_serializer = Serializer(FormDelta)
+
 
 @forms_router.post("/")
 async def create_form(
     id: int | None = None,
     user: UserModel = Depends(get_current_superuser),
+    session: AsyncSession = Depends(get_async_session),
 ) -> Form:
     if id:
-        form_out = await FormService.copy_form(id, user.id)
-        return form_out
+        form_out = await FormService.copy_form(session, id, user.id)
     else:
-        form_out = await FormService.create_form(user.id)
-        return form_out
+        form_out = await FormService.create_form(session, user.id)
+    return form_serializer.response(form_out)
 
 
 @forms_router.get("/")
 async def get_list_forms(
     templates: bool,
     my: bool,
-    offset: Optional[str] = 0,
-    limit: Optional[str] = 100,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    offset: Optional[int] = None,
     user: UserModel = Depends(get_current_superuser),
-) -> List[FormWithoutItems]:
-    forms = await FormService.get_list_forms(
-        templates, my, user.id, offset=offset, limit=limit
+    session: AsyncSession = Depends(get_async_session),
+) -> Union[Page[FormWithoutItems], List[FormWithoutItems]]:
+    page = await FormService.get_list_forms(
+        session, templates, my, user.id, cursor=cursor, offset=offset, limit=limit
     )
-    return forms
+    # Clients of the legacy ?offset= listing parse a bare list.
+    if offset is not None:
+        return form_list_serializer.response(page.items)
+    return form_page_serializer.response(page._asdict())
 
 
 @forms_router.post("/{id}")
 async def form_to_review(
-    id: int, user: UserModel = Depends(get_current_superuser)
+    id: int,
+    user: UserModel = Depends(get_current_superuser),
+    session: AsyncSession = Depends(get_async_session),
 ) -> Form:
-    form = await FormService.get_form(id)
-    if form.creator_id != user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
-    form_out = await FormService.form_to_review(id)
-    return form_out
+    etag, document = await FormService.form_to_review(session, id, user.id)
+    return Response(
+        content=document, media_type="application/json", headers={"ETag": etag}
+    )
 
 
 @forms_router.get("/{id}")
-async def get_form(id: int, user: UserModel = Depends(get_current_superuser)) -> Form:
-    return await FormService.get_form(id)
+async def get_form(
+    id: int,
+    if_none_match: Optional[str] = Header(None),
+    user: UserModel = Depends(get_current_superuser),
+    session: AsyncSession = Depends(get_async_session),
+) -> Form:
+    etag, document = await FormService.get_form_document(session, id, if_none_match)
+    if document is None:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+    return Response(
+        content=document, media_type="application/json", headers={"ETag": etag}
+    )
+
+
+@forms_router.get("/{id}/published")
+async def get_published_form(
+    id: int,
+    if_none_match: Optional[str] = Header(None),
+    user: UserModel = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+) -> Form:
+    version, document = await FormService.get_published_document(
+        session, id, if_none_match
+    )
+    headers = {
+        "ETag": form_etag(version),
+        "Cache-Control": "no-cache",
+        "Content-Location": f"versions/{version}",
+    }
+    if document is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=document, media_type="application/json", headers=headers)
+
+
+@forms_router.get("/{id}/versions/{version}")
+async def get_form_version(
+    id: int,
+    version: int,
+    user: UserModel = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+) -> Form:
+    document = await FormService.get_snapshot_document(session, id, version)
+    return Response(
+        content=document,
+        media_type="application/json",
+        headers={
+            "ETag": form_etag(version),
+            "Cache-Control": "private, max-age=31536000, immutable",
+        },
+    )
 
 
 @forms_router.put("/{id}")  # ! in progress
 async def update_form(
-    id: int, update_schema: UpdateSchema, user: User = Depends(get_current_superuser)
-) -> Optional[Form]:
-    form = await FormService.get_form(id, without_items=True)
-    if user.id != form.creator_id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
-    res = await FormService.update_form_by_schema(update_schema, id)
-    return res
+    id: int,
+    update_schema: UpdateSchema,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    user: User = Depends(get_current_superuser),
+    session: AsyncSession = Depends(get_async_session),
+) -> Union[Form, FormDelta, None]:
+    etag, result = await FormService.update_form_by_schema(
+        session, update_schema, id, user.id, if_match
+    )
+    if result is None:
+        response.headers["ETag"] = etag
+        return None
+    if isinstance(result, FormDelta):
+        return form_delta_serializer.response(
+            result, trusted=True, headers={"ETag": etag}
+        )
+    return Response(
+        content=result, media_type="application/json", headers={"ETag": etag}
+    )
@@ -1,8 +1,8 @@
 import uuid
 from datetime import datetime
-from typing import List, Literal, Optional, Union
+from typing import Annotated, Any, List, Literal, Optional, Union
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from .enums import Color, ItemType, Organization
 
@@ -35,6 +35,7 @@ class ItemBase(BaseModel):
 
 
 class ItemCreate(ItemBase):
+    # 1-based position to insert at, as shown to the client.
     item_order: int = 1
     form_id: int
 
@@ -44,18 +45,26 @@ class ItemUpdate(ItemBase):
     required: Optional[bool] = None
 
 
-class Item(ItemBase):
+class ItemWithoutOptions(ItemBase):
     id: int
     title: Optional[str] = None
     item_type: ItemType
     item_order: int
     required: bool
     form_id: int
-    options: list[Option] = []
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class Item(ItemWithoutOptions):
+    options: list[Option] = []
+
+
+class ItemPosition(BaseModel):
+    id: int
+    item_order: int
+
+
 class FormBase(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -91,6 +100,14 @@ class Form(FormBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class FormSnapshot(BaseModel):
+    form_id: int
+    version: int
+    published_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class FormWithoutItems(FormBase):
     id: int
     title: Optional[str] = None
@@ -126,54 +143,111 @@ class OptionUpdateRequest(BaseModel):
 #                   'deleteOption', 'updateOption']
 #     request: Union[FormUpdate, ItemCreate, ItemMove, int,
 #                    ItemUpdateRequest, OptionCreate, int, OptionUpdateRequest]
+class FormDelta(BaseModel):
+    # Only what a save created, changed or removed, as the rows were written.
+    # Items whose position shifted without other changes are listed in
+    # movedItems with their new item_order.
+    version: int
+    form: Optional[FormWithoutItems] = None
+    createdItems: List[Item] = []
+    updatedItems: List[ItemWithoutOptions] = []
+    movedItems: List[ItemPosition] = []
+    deletedItemIds: List[int] = []
+    createdOptions: List[Option] = []
+    updatedOptions: List[Option] = []
+    deletedOptionIds: List[int] = []
+
+
 class ItemDelete(BaseModel):
     id: int
     location: int
 
 
 class UpdateFormRequest(BaseModel):
+    op: Literal["updateForm"]
     updateForm: FormUpdate
 
 
 class CreateItemRequest(BaseModel):
+    op: Literal["createItem"]
     createItem: ItemCreate
 
 
 class MoveItemRequest(BaseModel):
+    op: Literal["moveItem"]
     moveItem: ItemMove
 
 
 class DeleteItemRequest(BaseModel):
+    op: Literal["deleteItem"]
     deleteItem: ItemDelete
 
 
 class UpdateItemRequest(BaseModel):
+    op: Literal["updateItem"]
     updateItem: ItemUpdateRequest
 
 
 class CreateOptionRequest(BaseModel):
+    op: Literal["createOption"]
     createOption: OptionCreate
 
 
 class DeleteOptionRequest(BaseModel):
+    op: Literal["deleteOption"]
     deleteOptionId: int
 
 
 class UpdateOptionRequest(BaseModel):
+    op: Literal["updateOption"]
     updateOption: OptionUpdateRequest
 
 
+UpdateRequest = Annotated[
+    Union[
+        UpdateFormRequest,
+        CreateItemRequest,
+        MoveItemRequest,
+        DeleteItemRequest,
+        UpdateItemRequest,
+        CreateOptionRequest,
+        DeleteOptionRequest,
+        UpdateOptionRequest,
+    ],
+    Field(discriminator="op"),
+]
+
+# Requests in the original shape, e.g. {"createItem": {...}}, have no "op";
+# it is taken from their only key.
+LEGACY_REQUEST_OPS = {
+    "updateForm": "updateForm",
+    "createItem": "createItem",
+    "moveItem": "moveItem",
+    "deleteItem": "deleteItem",
+    "updateItem": "updateItem",
+    "createOption": "createOption",
+    "deleteOptionId": "deleteOption",
+    "updateOption": "updateOption",
+}
+
+
+def tag_legacy_request(request: Any) -> Any:
+    if isinstance(request, dict) and "op" not in request and len(request) == 1:
+        op = LEGACY_REQUEST_OPS.get(next(iter(request)))
+        if op is not None:
+            return {"op": op, **request}
+    return request
+
+
 class UpdateSchema(BaseModel):
     includeFormInResponse: bool
-    requests: List[
-        Union[
-            UpdateFormRequest,
-            CreateItemRequest,
-            MoveItemRequest,
-            DeleteItemRequest,
-            UpdateItemRequest,
-            CreateOptionRequest,
-            DeleteOptionRequest,
-            UpdateOptionRequest,
-        ]
-    ]
+    # Answer with FormDelta instead; ignored when the whole form is requested.
+    includeChangesInResponse: bool = False
+    requests: List[UpdateRequest]
+
+    @field_validator("requests", mode="before")
+    @classmethod
+    def tag_legacy_requests(cls, requests: Any) -> Any:
+        if isinstance(requests, list):
+            return [tag_legacy_request(request) for request in requests]
+        return requests
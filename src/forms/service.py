@@ -1,105 +1,52 @@
 import uuid
-from typing import List, Optional
+from typing import NoReturn, Optional, Tuple, Union
 
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import async_session_maker
-from .dao import FormDAO, ItemDAO, OptionDAO
-from .models import FormModel, ItemModel, OptionModel
-from .schemas import (
-    CreateItemRequest,
-    CreateOptionRequest,
-    DeleteItemRequest,
-    DeleteOptionRequest,
-    FormCreate,
-    FormUpdate,
-    ItemCreate,
-    ItemDelete,
-    ItemMove,
-    ItemUpdateRequest,
-    MoveItemRequest,
-    OptionCreate,
-    OptionUpdateRequest,
-    UpdateFormRequest,
-    UpdateItemRequest,
-    UpdateOptionRequest,
-    UpdateSchema,
+from ..exceptions import PreconditionFailedException
+from ..pagination import KeysetPage
+from .cache import (
+    get_form_document,
+    get_form_snapshot,
+    invalidate_form_document,
+    set_form_document,
+    set_form_snapshot,
 )
+from .dao import FormDAO, FormSnapshotDAO
+from .editor import FormEditor
+from .models import FormModel
+from .schemas import FormCreate, FormDelta, UpdateSchema
+from .utils import etag_versions, form_etag
 
 
 class FormService:
     @classmethod
-    async def create_form(cls, user_id: uuid.UUID) -> FormModel:
-        async with async_session_maker() as session:
-            new_form = await FormDAO.add(session, FormCreate(creator_id=user_id))
-
-            form = await FormDAO.update(
-                session,
-                FormModel.id == new_form.id,
-                obj_in=FormUpdate(link=f"http://127.0.0.1:3000/forms/{new_form.id}"),
-            )
-            await session.commit()
+    async def create_form(cls, session: AsyncSession, user_id: uuid.UUID) -> FormModel:
+        form = await FormDAO.add_with_link(session, FormCreate(creator_id=user_id))
+        await session.commit()
         return form
 
     @classmethod
-    async def copy_form(cls, form_id: int, creator_id: uuid.UUID) -> FormModel:
-        async with async_session_maker() as session:
-            original_form = await FormDAO.find_form(session, form_id)
-
-            if not original_form:
-                raise HTTPException(status_code=404, detail="Form not found")
-
-            form = await FormDAO.add(
-                session,
-                obj_in={
-                    "title": original_form.title,
-                    "description": original_form.description,
-                    "is_template": False,
-                    "organization": original_form.organization,
-                    "color": original_form.color,
-                    "to_review": False,
-                    "creator_id": creator_id,
-                },
-            )
-            new_form = await FormDAO.update(
-                session,
-                FormModel.id == form.id,
-                obj_in={"link": f"http://127.0.0.1:3000/forms/{form.id}"},
-            )
-
-            for original_item in original_form.items:
-                new_item = await ItemDAO.add(
-                    session,
-                    obj_in={
-                        "title": original_item.title,
-                        "description": original_item.description,
-                        "item_type": original_item.item_type,
-                        "item_order": original_item.item_order,
-                        "required": original_item.required,
-                        "form_id": new_form.id,
-                    },
-                )
-                for original_option in original_item.options:
-                    new_option = await OptionDAO.add(
-                        session,
-                        obj_in={"title": original_option.title, "item_id": new_item.id},
-                    )
-                    new_item.options.append(new_option)
-                new_form.items.append(new_item)
+    async def copy_form(
+        cls, session: AsyncSession, form_id: int, creator_id: uuid.UUID
+    ) -> FormModel:
+        new_form_id = await FormDAO.clone(session, form_id, creator_id)
+        if new_form_id is None:
+            raise HTTPException(status_code=404, detail="Form not found")
 
-            await session.commit()
+        new_form = await FormDAO.find_form(session, new_form_id)
+        await session.commit()
         return new_form
 
     @classmethod
     async def get_form(
-        cls, id: int, without_items: bool = False
+        cls, session: AsyncSession, id: int, without_items: bool = False
     ) -> Optional[FormModel]:
-        async with async_session_maker() as session:
-            if without_items:
-                form = await FormDAO.find_one_or_none(session, FormModel.id == id)
-            else:
-                form = await FormDAO.find_form(session, id)
+        if without_items:
+            form = await FormDAO.find_one_or_none(session, FormModel.id == id)
+        else:
+            form = await FormDAO.find_form(session, id)
         if not form:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -107,170 +54,207 @@ class FormService:
             )
         return form
 
+    @classmethod
+    async def get_form_document(
+        cls, session: AsyncSession, id: int, if_none_match: Optional[str] = None
+    ) -> Tuple[str, Optional[bytes]]:
+        # Only the form row is read for a 304 or a cache hit; items and
+        # options are loaded when the current version is not cached yet.
+        # The document is None when the client's copy is current.
+        row = await FormDAO.find_version(session, id)
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Form with {id=} not found",
+            )
+
+        version, creator_id = row
+        if if_none_match is not None:
+            versions = etag_versions(if_none_match, weak=True)
+            if versions is None or version in versions:
+                return form_etag(version), None
+
+        document = get_form_document(id, version, creator_id)
+        if document is None:
+            version, creator_id, document = await cls._render_document(session, id)
+            set_form_document(id, version, creator_id, document)
+        return form_etag(version), document
+
     @classmethod
     async def get_list_forms(
         cls,
+        session: AsyncSession,
         is_template: bool,
         my: bool,
         creator_id: uuid.UUID,
-        offset: int = 0,
+        cursor: Optional[str] = None,
+        offset: Optional[int] = None,
         limit: int = 100,
-    ) -> List[FormModel]:
-        async with async_session_maker() as session:
-            filter_by = {}
-            if is_template:
-                filter_by.update({"is_template": True})
-            if my:
-                filter_by.update({"creator_id": creator_id})
+    ) -> KeysetPage:
+        filter_by = {}
+        if is_template:
+            filter_by.update({"is_template": True})
+        if my:
+            filter_by.update({"creator_id": creator_id})
 
+        if offset is not None:
             forms = await FormDAO.find_all(
                 session, offset=offset, limit=limit, **filter_by
             )
-        return forms
-
-    @classmethod
-    async def form_to_review(cls, id: int) -> FormModel:
-        async with async_session_maker() as session:
-            form = await FormDAO.update(
-                session, FormModel.id == id, obj_in={"to_review": True}
-            )
-            await session.commit()
-            # ! надо попробовать найти решение этой проблемы (returning в update не возвращает relationship-ы)
-            form = await FormDAO.find_form(session, id)
+            return KeysetPage(forms)
 
-        return form
+        return await FormDAO.find_page(
+            session,
+            order_by=FormModel.created_at,
+            descending=True,
+            cursor=cursor,
+            limit=limit,
+            **filter_by,
+        )
 
     @classmethod
-    async def update_form_by_schema(
-        cls, update_schema: UpdateSchema, form_id: int
-    ) -> Optional[FormModel]:
-        async with async_session_maker() as session:
-            for request in update_schema.requests:
-                # print(type(request))
-                # print(request)
-                # print()
-                if isinstance(request, UpdateFormRequest):
-                    await cls._update_form(session, request.updateForm, form_id)
-                elif isinstance(request, CreateItemRequest):
-                    await cls._create_item(session, request.createItem)
-                elif isinstance(request, MoveItemRequest):
-                    await cls._move_item(session, request.moveItem, form_id)
-                elif isinstance(request, DeleteItemRequest):
-                    await cls._delete_item(session, request.deleteItem)
-                elif isinstance(request, UpdateItemRequest):
-                    await cls._update_item(session, request.updateItem)
-                elif isinstance(request, CreateOptionRequest):
-                    await cls._create_option(session, request.createOption)
-                elif isinstance(request, DeleteOptionRequest):
-                    await cls._delete_option(session, request.deleteOption)
-                elif isinstance(request, UpdateOptionRequest):
-                    await cls._update_option(session, request.updateOption)
-
-            await session.commit()
+    async def form_to_review(
+        cls, session: AsyncSession, id: int, creator_id: uuid.UUID
+    ) -> Tuple[str, bytes]:
+        form = await FormDAO.update(
+            session,
+            FormModel.id == id,
+            obj_in={
+                "to_review": True,
+                "version": FormModel.version + 1,
+                "published_version": FormModel.version + 1,
+            },
+            creator_id=creator_id,
+        )
+        if form is None:
+            await cls._raise_for_missed_write(
+                session,
+                id,
+                creator_id,
+                HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Form was changed concurrently",
+                ),
+            )
+        version, document = await FormSnapshotDAO.publish(session, id)
+        await session.commit()
+        invalidate_form_document(id)
+        document = document.encode()
+        set_form_snapshot(id, version, document)
 
-            if update_schema.includeFormInResponse:
-                form_out = await FormDAO.find_form(session, form_id)
-                return form_out
-            else:
-                return None
+        return form_etag(version), document
 
     @classmethod
-    async def _update_form(
-        cls, session: AsyncSession, schema: FormUpdate, form_id: int
-    ) -> None:
-        await FormDAO.update(session, FormModel.id == form_id, obj_in=schema)
+    async def get_published_document(
+        cls, session: AsyncSession, id: int, if_none_match: Optional[str] = None
+    ) -> Tuple[int, Optional[bytes]]:
+        version = await FormDAO.find_published_version(session, id)
+        if version is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Form with {id=} is not published",
+            )
+        if if_none_match is not None:
+            versions = etag_versions(if_none_match, weak=True)
+            if versions is None or version in versions:
+                return version, None
+        return version, await cls.get_snapshot_document(session, id, version)
 
     @classmethod
-    async def _create_item(cls, session: AsyncSession, schema: ItemCreate) -> None:
-        items = await ItemDAO.find_all(
-            session,
-            ItemModel.form_id == schema.form_id,
-            ItemModel.item_order >= schema.item_order,
-        )
-        update_list = [
-            {"id": item.id, "item_order": item.item_order + 1} for item in items
-        ]
-        if update_list != []:
-            await ItemDAO.update_bulk(session, update_list)
-
-        await ItemDAO.add(session, obj_in=schema)
+    async def get_snapshot_document(
+        cls, session: AsyncSession, id: int, version: int
+    ) -> bytes:
+        document = get_form_snapshot(id, version)
+        if document is None:
+            snapshot = await FormSnapshotDAO.find_document(session, id, version)
+            if snapshot is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Form with {id=} has no published {version=}",
+                )
+            document = snapshot.encode()
+            set_form_snapshot(id, version, document)
+        return document
 
     @classmethod
-    async def _move_item(
-        cls, session: AsyncSession, schema: ItemMove, form_id: int
-    ) -> None:
-        original_item = await ItemDAO.find_one_or_none(
-            session, item_order=schema.original_location, form_id=form_id
-        )
-        if not original_item:
+    async def _render_document(
+        cls, session: AsyncSession, id: int
+    ) -> Tuple[int, Optional[uuid.UUID], bytes]:
+        # Writers cache the result only after commit: a rolled back version
+        # number is reused by the next edit.
+        row = await FormDAO.find_document(session, id)
+        if row is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"item with location={schema.original_location} in form with id={form_id} not found",
-            )
-        if schema.new_location < schema.original_location:
-            items = await ItemDAO.find_all(
-                session,
-                ItemModel.item_order >= schema.new_location,
-                ItemModel.item_order < schema.original_location,
-                form_id=form_id,
-            )
-            update_list = [
-                {"id": item.id, "item_order": item.item_order + 1} for item in items
-            ]
-        elif schema.new_location > schema.original_location:
-            items = await ItemDAO.find_all(
-                session,
-                ItemModel.item_order > schema.original_location,
-                ItemModel.item_order <= schema.new_location,
-                form_id=form_id,
+                detail=f"Form with {id=} not found",
             )
-            update_list = [
-                {"id": item.id, "item_order": item.item_order - 1} for item in items
-            ]
-        update_list.append({"id": original_item.id, "item_order": schema.new_location})
-        await ItemDAO.update_bulk(session, update_list)
+        document, version, creator_id = row
+        return version, creator_id, document.encode()
 
     @classmethod
-    async def _delete_item(cls, session: AsyncSession, schema: ItemDelete) -> None:
-        current_item = await ItemDAO.find_one_or_none(
-            session, id=schema.id, item_order=schema.location
+    async def update_form_by_schema(
+        cls,
+        session: AsyncSession,
+        update_schema: UpdateSchema,
+        form_id: int,
+        creator_id: uuid.UUID,
+        if_match: Optional[str] = None,
+    ) -> Tuple[str, Union[bytes, FormDelta, None]]:
+        # The version is bumped first so a conditional or foreign write fails
+        # before doing any work and the form row is held for the whole edit.
+        versions = etag_versions(if_match) if if_match is not None else None
+        version = await FormDAO.bump_version(
+            session, form_id, versions, creator_id=creator_id
         )
-        if not current_item:
-            HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Wrong data")
+        if version is None:
+            await cls._raise_for_missed_write(
+                session, form_id, creator_id, PreconditionFailedException()
+            )
 
-        items = await ItemDAO.find_all(
+        editor = FormEditor(form_id)
+        await editor.load(
             session,
-            ItemModel.form_id == current_item.form_id,
-            ItemModel.item_order > current_item.item_order,
-        )
-        update_list = [
-            {"id": item.id, "item_order": item.item_order - 1} for item in items
-        ]
-        if update_list != []:
-            await ItemDAO.update_bulk(session, update_list)
-
-        await ItemDAO.delete(session, ItemModel.id == schema.id)
-
-    @classmethod
-    async def _update_item(
-        cls, session: AsyncSession, schema: ItemUpdateRequest
-    ) -> None:
-        await ItemDAO.update(
-            session, ItemModel.id == schema.item_id, obj_in=schema.item
+            with_items=any(
+                request.op != "updateForm" for request in update_schema.requests
+            ),
+            with_options=any(
+                request.op in ("deleteOption", "updateOption")
+                for request in update_schema.requests
+            ),
         )
+        for request in update_schema.requests:
+            editor.apply(request)
+        await editor.flush(session)
 
-    @classmethod
-    async def _create_option(cls, session: AsyncSession, schema: OptionCreate) -> None:
-        await OptionDAO.add(session, obj_in=schema)
+        document = None
+        if update_schema.includeFormInResponse:
+            version, creator_id, document = await cls._render_document(session, form_id)
 
-    @classmethod
-    async def _delete_option(cls, session: AsyncSession, schema: int) -> None:
-        await OptionDAO.delete(session, OptionModel.id == schema)
+        await session.commit()
+        invalidate_form_document(form_id)
+        if document is not None:
+            set_form_document(form_id, version, creator_id, document)
+        elif update_schema.includeChangesInResponse:
+            return form_etag(version), editor.delta(version)
+        return form_etag(version), document
 
     @classmethod
-    async def _update_option(
-        cls, session: AsyncSession, schema: OptionUpdateRequest
-    ) -> None:
-        await OptionDAO.update(
-            session, OptionModel.id == schema.option_id, obj_in=schema.option
-        )
+    async def _raise_for_missed_write(
+        cls,
+        session: AsyncSession,
+        id: int,
+        creator_id: uuid.UUID,
+        otherwise: HTTPException,
+    ) -> NoReturn:
+        # Only reached when a write scoped to the creator matched no row.
+        # ``otherwise`` is raised when the form exists and is the creator's,
+        # i.e. it no longer matched the write's other conditions.
+        row = await FormDAO.find_version(session, id)
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Form with {id=} not found",
+            )
+        if row.creator_id != creator_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+        raise otherwise
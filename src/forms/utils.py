@@ -0,0 +1,45 @@
+from typing import List, Optional, Set
+
+# Distance between neighbouring items' order keys after a rebalance: an item
+# can be inserted or moved into the same spot ~10 times before keys collide.
+ORDER_KEY_GAP = 1024
+
+
+def order_keys_between(
+    before: Optional[int], after: Optional[int], count: int
+) -> Optional[List[int]]:
+    # ``count`` increasing keys strictly between two neighbours, or None when
+    # the gap is too small and the form has to be respaced.
+    if before is None and after is None:
+        return [ORDER_KEY_GAP * (n + 1) for n in range(count)]
+    if before is None:
+        return [after - ORDER_KEY_GAP * (count - n) for n in range(count)]
+    if after is None:
+        return [before + ORDER_KEY_GAP * (n + 1) for n in range(count)]
+    step = (after - before) // (count + 1)
+    if step < 1:
+        return None
+    return [before + step * (n + 1) for n in range(count)]
+
+
+def form_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def etag_versions(header: str, weak: bool = False) -> Optional[Set[int]]:
+    # Versions listed in an If-Match / If-None-Match header; None means "*".
+    # Weak tags only count with ``weak``: If-None-Match compares weakly,
+    # If-Match strongly (RFC 9110, 13.1).
+    versions = set()
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return None
+        if tag.startswith("W/"):
+            if not weak:
+                continue
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag.isdigit():
+            versions.add(int(tag))
+    return versions
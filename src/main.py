@@ -1,8 +1,10 @@
+import asyncio
 import time
+from contextlib import asynccontextmanager, suppress
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from sqladmin import Admin
 
 from .admin.auth import authentication_backend
@@ -17,9 +19,38 @@ from .admin.views import (
 )
 from .config import settings
 from .database import engine
+from .forms.reviews.ingestion import review_ingestion
+from .forms.reviews.maintenance import result_stats_folder
+from .metrics import collect
 from .routers import main_router
+from .users.dependencies import get_current_superuser
+from .users.maintenance import refresh_session_sweeper
+from .users.schemas import Principal
 
-app = FastAPI(title=settings.app_name)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    background_tasks = []
+    if settings.REFRESH_SESSION_SWEEPER_ENABLED:
+        background_tasks.append(asyncio.create_task(refresh_session_sweeper.run()))
+    if settings.REVIEW_GROUP_COMMIT:
+        background_tasks.append(asyncio.create_task(review_ingestion.run()))
+    if settings.RESULT_STATS_FOLDER_ENABLED:
+        background_tasks.append(asyncio.create_task(result_stats_folder.run()))
+
+    yield
+
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+
+app = FastAPI(
+    title=settings.app_name,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 origins = ["http://127.0.0.1:3000"]
 
@@ -72,3 +103,8 @@ def home():
     <a href="http://127.0.0.1:8000/docs">Documentation</a><br>
     <a href="http://127.0.0.1:8000/redoc">ReDoc</a>
     """
+
+
+@app.get("/api/metrics", tags=["metrics"])
+async def get_metrics(user: Principal = Depends(get_current_superuser)) -> dict:
+    return collect()
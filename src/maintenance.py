@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import async_session_maker, try_advisory_xact_lock
+
+logger = logging.getLogger(__name__)
+
+Batch = Callable[[AsyncSession, int], Awaitable[int]]
+
+
+class BatchedJob:
+    # A background job run every ``interval`` seconds by each gunicorn worker.
+    # A run repeats its statements in batches of ``batch_size`` rows, one
+    # transaction each, until a statement returns a short batch or ``budget``
+    # seconds have passed. The advisory lock is taken per batch, so only one
+    # worker runs at a time and no lock is held between batches.
+    lock_id: int
+
+    def __init__(
+        self,
+        interval: float,
+        budget: float,
+        batch_size: int,
+        batch_timeout_ms: Optional[int] = None,
+    ):
+        self.interval = interval
+        self.budget = budget
+        self.batch_size = batch_size
+        self.batch_timeout_ms = batch_timeout_ms
+
+        self.runs = 0
+        self.failures = 0
+        self.lock_skipped = 0
+        self.batches = 0
+        self.rows = {kind: 0 for kind, _ in self._batches()}
+        self.last_batch_seconds = 0.0
+        self.max_batch_seconds = 0.0
+        self.total_batch_seconds = 0.0
+
+    def _batches(self) -> List[Tuple[str, Batch]]:
+        raise NotImplementedError
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.failures += 1
+                logger.exception("%s run failed", type(self).__name__)
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> None:
+        self.runs += 1
+        deadline = time.monotonic() + self.budget
+        async with async_session_maker() as session:
+            for kind, batch in self._batches():
+                while time.monotonic() < deadline:
+                    started_at = time.monotonic()
+                    if not await try_advisory_xact_lock(session, self.lock_id):
+                        await session.rollback()
+                        self.lock_skipped += 1
+                        return
+
+                    if self.batch_timeout_ms is not None:
+                        await session.execute(
+                            text(
+                                f"SET LOCAL statement_timeout = {self.batch_timeout_ms}"
+                            )
+                        )
+                    rows = await batch(session, self.batch_size)
+                    await session.commit()
+                    self._observe_batch(kind, rows, time.monotonic() - started_at)
+
+                    if rows < self.batch_size:
+                        break
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "lock_skipped": self.lock_skipped,
+            "batches": self.batches,
+            "rows": dict(self.rows),
+            "last_batch_seconds": self.last_batch_seconds,
+            "max_batch_seconds": self.max_batch_seconds,
+            "avg_batch_seconds": self.total_batch_seconds / self.batches
+            if self.batches
+            else 0.0,
+        }
+
+    def _observe_batch(self, kind: str, rows: int, elapsed: float) -> None:
+        self.batches += 1
+        self.rows[kind] += rows
+        self.last_batch_seconds = elapsed
+        self.max_batch_seconds = max(self.max_batch_seconds, elapsed)
+        self.total_batch_seconds += elapsed
@@ -0,0 +1,37 @@
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Sequence
+
+Collector = Callable[[], Dict[str, Any]]
+
+_collectors: Dict[str, Collector] = {}
+
+
+def register_collector(name: str, collector: Collector) -> None:
+    _collectors[name] = collector
+
+
+def collect() -> Dict[str, Dict[str, Any]]:
+    return {name: collector() for name, collector in _collectors.items()}
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def stats(self) -> Dict[str, Any]:
+        # Cumulative counts per upper bound, as in Prometheus histograms.
+        buckets = {}
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            buckets[str(bound)] = total
+        buckets["+Inf"] = self.count
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
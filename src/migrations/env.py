@@ -12,8 +12,13 @@ sys.path.insert(0, dirname(dirname(dirname(abspath(__file__)))))
 from src.config import settings
 from src.database import Base
 from src.users.models import UserModel, RefreshSessionModel
-from src.forms.models import FormModel, ItemModel, OptionModel
-from src.forms.reviews.models import ReviewModel, AnswerModel
+from src.forms.models import FormModel, FormSnapshotModel, ItemModel, OptionModel
+from src.forms.reviews.models import (
+    ReviewModel,
+    AnswerModel,
+    FormItemStatsModel,
+    FormItemStatsDeltaModel,
+)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,56 @@
+"""item order key
+
+Revision ID: c4f7a2e9b113
+Revises: 9d2c4a6e5f80
+Create Date: 2026-10-18 14:36:52.118734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f7a2e9b113'
+down_revision = '9d2c4a6e5f80'
+branch_labels = None
+depends_on = None
+
+ORDER_KEY_GAP = 1024
+
+
+def upgrade() -> None:
+    op.add_column('item', sa.Column('order_key', sa.BigInteger(), nullable=True))
+    op.execute(
+        f"""
+        UPDATE item SET order_key = ranked.position * {ORDER_KEY_GAP}
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY form_id ORDER BY item_order, id
+            ) AS position
+            FROM item
+        ) AS ranked
+        WHERE item.id = ranked.id
+        """
+    )
+    op.alter_column('item', 'order_key', nullable=False)
+    op.create_index('ix_item_form_id_order_key', 'item', ['form_id', 'order_key'], unique=False)
+    op.drop_column('item', 'item_order')
+
+
+def downgrade() -> None:
+    op.add_column('item', sa.Column('item_order', sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE item SET item_order = ranked.position
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY form_id ORDER BY order_key, id
+            ) AS position
+            FROM item
+        ) AS ranked
+        WHERE item.id = ranked.id
+        """
+    )
+    op.alter_column('item', 'item_order', nullable=False)
+    op.drop_index('ix_item_form_id_order_key', table_name='item')
+    op.drop_column('item', 'order_key')
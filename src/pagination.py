@@ -0,0 +1,65 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Generic, List, NamedTuple, Optional, Tuple, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy.orm import InstrumentedAttribute
+
+from .exceptions import InvalidCursorException
+
+ItemType = TypeVar("ItemType")
+
+
+class KeysetPage(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class Page(BaseModel, Generic[ItemType]):
+    items: List[ItemType]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+def encode_cursor(backwards: bool, values: Tuple[Any, ...]) -> str:
+    payload = {"b": backwards, "v": [_encode_value(value) for value in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, columns: Tuple[InstrumentedAttribute, ...]
+) -> Tuple[bool, Tuple[Any, ...]]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        backwards, values = bool(payload["b"]), payload["v"]
+        if len(values) != len(columns):
+            raise ValueError
+        return backwards, tuple(
+            _decode_value(column, value) for column, value in zip(columns, values)
+        )
+    except Exception:
+        raise InvalidCursorException
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (datetime, uuid.UUID)):
+        return str(value)
+    return value
+
+
+def _decode_value(column: InstrumentedAttribute, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    if not isinstance(value, python_type):
+        raise ValueError
+    return value
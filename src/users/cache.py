@@ -0,0 +1,40 @@
+import uuid
+from typing import Optional
+
+from ..cache import LRUCache
+from ..config import settings
+from ..metrics import register_collector
+from .schemas import Principal
+
+# Per-process: other workers only see an invalidation once their entry expires.
+principal_cache: LRUCache[uuid.UUID, Principal] = LRUCache(
+    maxsize=settings.USER_CACHE_MAXSIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+# The TTL is the revocation window for stateless access tokens.
+token_epoch_cache: LRUCache[uuid.UUID, int] = LRUCache(
+    maxsize=settings.USER_CACHE_MAXSIZE, ttl=settings.TOKEN_EPOCH_TTL_SECONDS
+)
+
+register_collector("user_principal_cache", principal_cache.stats)
+register_collector("token_epoch_cache", token_epoch_cache.stats)
+
+
+def get_principal(user_id: uuid.UUID) -> Optional[Principal]:
+    return principal_cache.get(user_id)
+
+
+def set_principal(user: Principal) -> None:
+    principal_cache.set(user.id, user)
+
+
+def invalidate_principal(user_id: uuid.UUID) -> None:
+    principal_cache.invalidate(user_id)
+    token_epoch_cache.invalidate(user_id)
+
+
+def get_token_epoch(user_id: uuid.UUID) -> Optional[int]:
+    return token_epoch_cache.get(user_id)
+
+
+def set_token_epoch(user_id: uuid.UUID, token_epoch: int) -> None:
+    token_epoch_cache.set(user_id, token_epoch)
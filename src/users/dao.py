@@ -1,3 +1,11 @@
+import uuid
+from typing import Any, Dict, Optional, Tuple, Union
+
+from sqlalchemy import delete, insert, select, true, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func, over
+
 from ..dao import BaseDAO
 from .models import RefreshSessionModel, UserModel
 from .schemas import (
@@ -11,8 +19,166 @@ from .schemas import (
 class UserDAO(BaseDAO[UserModel, UserCreateDB, UserUpdateDB]):
     model = UserModel
 
+    @classmethod
+    async def find_token_epoch(
+        cls, session: AsyncSession, user_id: uuid.UUID
+    ) -> Optional[int]:
+        stmt = select(UserModel.token_epoch).filter(UserModel.id == user_id)
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
 
 class RefreshSessionDAO(
     BaseDAO[RefreshSessionModel, RefreshSessionCreate, RefreshSessionUpdate]
 ):
     model = RefreshSessionModel
+
+    @classmethod
+    async def add_capped(
+        cls,
+        session: AsyncSession,
+        obj_in: Union[RefreshSessionCreate, Dict[str, Any]],
+        max_per_user: int,
+    ) -> RefreshSessionModel:
+        # Creates the session and drops the user's oldest ones beyond
+        # ``max_per_user``, so the cap holds at login and not only after the
+        # next sweep.
+        if isinstance(obj_in, dict):
+            create_data = obj_in
+        else:
+            create_data = obj_in.model_dump()
+        stmt = (
+            insert(RefreshSessionModel)
+            .values(
+                **create_data,
+                expires_at=RefreshSessionModel.expiry(
+                    func.now(), create_data["expires_in"]
+                ),
+            )
+            .returning(RefreshSessionModel)
+        )
+        result = await session.execute(stmt)
+        refresh_session = result.scalars().one()
+
+        keep = (
+            select(RefreshSessionModel.id)
+            .where(RefreshSessionModel.user_id == refresh_session.user_id)
+            .order_by(
+                RefreshSessionModel.created_at.desc(), RefreshSessionModel.id.desc()
+            )
+            .limit(max_per_user)
+        )
+        await session.execute(
+            delete(RefreshSessionModel)
+            .where(
+                RefreshSessionModel.user_id == refresh_session.user_id,
+                RefreshSessionModel.id.not_in(keep),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return refresh_session
+
+    @classmethod
+    async def rotate(
+        cls,
+        session: AsyncSession,
+        old_token: uuid.UUID,
+        new_token: uuid.UUID,
+        expires_in: int,
+    ) -> Tuple[bool, Optional[Row[Any]]]:
+        # One round trip: an expired token is deleted, a live one is swapped.
+        # Returns (expired, user) where user is None unless the swap happened.
+        expired = (
+            delete(RefreshSessionModel)
+            .where(
+                RefreshSessionModel.refresh_token == old_token,
+                RefreshSessionModel.expires_at <= func.now(),
+            )
+            .returning(RefreshSessionModel.id)
+            .cte("expired")
+        )
+        # UPDATE ... FROM "user": concurrent rotations of the same token
+        # serialize on the row lock and the loser matches no rows.
+        rotated = (
+            update(RefreshSessionModel)
+            .where(
+                RefreshSessionModel.refresh_token == old_token,
+                RefreshSessionModel.expires_at > func.now(),
+                RefreshSessionModel.user_id == UserModel.id,
+                UserModel.is_active.is_(True),
+            )
+            .values(
+                refresh_token=new_token,
+                expires_in=expires_in,
+                expires_at=RefreshSessionModel.expiry(
+                    RefreshSessionModel.created_at, expires_in
+                ),
+            )
+            .returning(
+                UserModel.id,
+                UserModel.is_active,
+                UserModel.is_verified,
+                UserModel.is_superuser,
+                UserModel.token_epoch,
+            )
+            .cte("rotated")
+        )
+        expired_count = (
+            select(func.count().label("expired")).select_from(expired).subquery()
+        )
+        stmt = select(expired_count.c.expired, rotated).select_from(
+            expired_count.outerjoin(rotated, true())
+        )
+
+        result = await session.execute(stmt)
+        row = result.one()
+        user = row if row.id is not None else None
+        return row.expired > 0, user
+
+    @classmethod
+    async def delete_expired(cls, session: AsyncSession, limit: int) -> int:
+        batch = (
+            select(RefreshSessionModel.id)
+            .where(RefreshSessionModel.expires_at <= func.now())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            delete(RefreshSessionModel)
+            .where(RefreshSessionModel.id.in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(stmt)
+        return result.rowcount
+
+    @classmethod
+    async def delete_over_limit(
+        cls, session: AsyncSession, limit: int, max_per_user: int
+    ) -> int:
+        # Sessions are capped at login; this only catches users that went over
+        # before that, so the window is computed for their sessions alone.
+        over_limit_users = (
+            select(RefreshSessionModel.user_id)
+            .group_by(RefreshSessionModel.user_id)
+            .having(func.count() > max_per_user)
+        )
+        ranked = (
+            select(
+                RefreshSessionModel.id,
+                over(
+                    func.row_number(),
+                    partition_by=RefreshSessionModel.user_id,
+                    order_by=RefreshSessionModel.created_at.desc(),
+                ).label("rank"),
+            )
+            .where(RefreshSessionModel.user_id.in_(over_limit_users))
+            .subquery()
+        )
+        batch = select(ranked.c.id).where(ranked.c.rank > max_per_user).limit(limit)
+        stmt = (
+            delete(RefreshSessionModel)
+            .where(RefreshSessionModel.id.in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(stmt)
+        return result.rowcount
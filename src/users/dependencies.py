@@ -1,19 +1,25 @@
 import uuid
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from fastapi import Depends, HTTPException, status
 from jose import jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config import settings
+from ..database import get_async_session
 from ..exceptions import InvalidTokenException
-from .models import UserModel
+from .cache import get_principal, get_token_epoch, set_principal, set_token_epoch
+from .schemas import Principal
 from .service import UserService
 from .utils import OAuth2PasswordBearerWithCookie
 
 oauth2_scheme = OAuth2PasswordBearerWithCookie(tokenUrl="/api/auth/login")
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> Optional[UserModel]:
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_async_session),
+) -> Optional[Principal]:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -21,9 +27,15 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> Optional[User
         user_id = payload.get("sub")
         if user_id is None:
             raise InvalidTokenException
+        user_id = uuid.UUID(user_id)
     except Exception:
         raise InvalidTokenException
-    current_user = await UserService.get_user(uuid.UUID(user_id))
+
+    if settings.STATELESS_AUTH and "token_epoch" in payload:
+        current_user = await _get_principal_from_claims(session, user_id, payload)
+    else:
+        current_user = await _get_principal(session, user_id)
+
     if not current_user.is_verified:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Verify email"
@@ -32,8 +44,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> Optional[User
 
 
 async def get_current_superuser(
-    current_user: UserModel = Depends(get_current_user),
-) -> UserModel:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not enough privileges"
@@ -42,10 +54,39 @@ async def get_current_superuser(
 
 
 async def get_current_active_user(
-    current_user: UserModel = Depends(get_current_user),
-) -> UserModel:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if not current_user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="User is not active"
         )
     return current_user
+
+
+async def _get_principal(session: AsyncSession, user_id: uuid.UUID) -> Principal:
+    current_user = get_principal(user_id)
+    if current_user is None:
+        db_user = await UserService.get_user(session, user_id)
+        current_user = Principal.model_validate(db_user)
+        set_principal(current_user)
+    return current_user
+
+
+async def _get_principal_from_claims(
+    session: AsyncSession, user_id: uuid.UUID, payload: Dict[str, Any]
+) -> Principal:
+    token_epoch = get_token_epoch(user_id)
+    if token_epoch is None:
+        token_epoch = await UserService.get_token_epoch(session, user_id)
+        if token_epoch is None:
+            raise InvalidTokenException
+        set_token_epoch(user_id, token_epoch)
+
+    if payload["token_epoch"] != token_epoch:
+        raise InvalidTokenException
+    return Principal(
+        id=user_id,
+        is_active=payload["is_active"],
+        is_verified=payload["is_verified"],
+        is_superuser=payload["is_superuser"],
+    )
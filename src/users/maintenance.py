@@ -0,0 +1,46 @@
+from functools import partial
+from typing import List, Tuple
+
+from ..config import settings
+from ..maintenance import Batch, BatchedJob
+from ..metrics import register_collector
+from .dao import RefreshSessionDAO
+
+
+class RefreshSessionSweeper(BatchedJob):
+    # Shared by every gunicorn worker: only the one holding it deletes a batch.
+    lock_id = 0x5E55_1011
+
+    def __init__(
+        self,
+        interval: float,
+        budget: float,
+        batch_size: int,
+        batch_timeout_ms: int,
+        max_sessions_per_user: int,
+    ):
+        self.max_sessions_per_user = max_sessions_per_user
+        super().__init__(interval, budget, batch_size, batch_timeout_ms)
+
+    def _batches(self) -> List[Tuple[str, Batch]]:
+        return [
+            ("expired", RefreshSessionDAO.delete_expired),
+            (
+                "over_limit",
+                partial(
+                    RefreshSessionDAO.delete_over_limit,
+                    max_per_user=self.max_sessions_per_user,
+                ),
+            ),
+        ]
+
+
+refresh_session_sweeper = RefreshSessionSweeper(
+    interval=settings.REFRESH_SESSION_SWEEP_INTERVAL_SECONDS,
+    budget=settings.REFRESH_SESSION_SWEEP_BUDGET_SECONDS,
+    batch_size=settings.REFRESH_SESSION_SWEEP_BATCH_SIZE,
+    batch_timeout_ms=settings.REFRESH_SESSION_SWEEP_BATCH_TIMEOUT_MS,
+    max_sessions_per_user=settings.MAX_REFRESH_SESSIONS_PER_USER,
+)
+
+register_collector("refresh_session_sweeper", refresh_session_sweeper.stats)
@@ -21,6 +21,7 @@ class UserModel(Base):
     is_active: Mapped[bool] = mapped_column(default=True)
     is_verified: Mapped[bool] = mapped_column(default=False)
     is_superuser: Mapped[bool] = mapped_column(default=False)
+    token_epoch: Mapped[int] = mapped_column(default=0, server_default="0")
 
 
 class RefreshSessionModel(Base):
@@ -35,3 +36,19 @@ class RefreshSessionModel(Base):
     user_id: Mapped[uuid.UUID] = mapped_column(
         UUID, sa.ForeignKey("user.id", ondelete="CASCADE")
     )
+
+    # Stored rather than computed so the sweeper's range scan uses an index;
+    # timestamptz + interval is not immutable and cannot be indexed directly.
+    expires_at: Mapped[datetime] = mapped_column(
+        sa.TIMESTAMP(timezone=True), index=True
+    )
+
+    __table_args__ = (
+        sa.Index("ix_refresh_session_user_id_created_at", "user_id", "created_at"),
+    )
+
+    @classmethod
+    def expiry(cls, start, expires_in):
+        return (
+            start + sa.literal_column("interval '1 second'", sa.Interval) * expires_in
+        )
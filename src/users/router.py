@@ -1,11 +1,15 @@
 import uuid
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from fastapi import APIRouter, Depends, Request, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config import settings
+from ..database import get_async_session
 from ..exceptions import InvalidCredentialsException
+from ..pagination import Page
+from ..responses import Serializer
 from .dependencies import (
     get_current_active_user,
     get_current_superuser,
@@ -18,22 +22,32 @@ from .service import AuthService, UserService
 auth_router = APIRouter(prefix="/auth", tags=["auth"])
 user_router = APIRouter(prefix="/users", tags=["user"])
 
+token_serializer = Serializer(Token)
+user_serializer = Serializer(User)
+user_page_serializer = Serializer(Page[User])
+user_list_serializer = Serializer(List[User])
+
 
 @auth_router.post("/register", status_code=status.HTTP_201_CREATED)
-async def register(user: UserCreate) -> User:
-    return await UserService.register_new_user(user)
+async def register(
+    user: UserCreate, session: AsyncSession = Depends(get_async_session)
+) -> User:
+    db_user = await UserService.register_new_user(session, user)
+    return user_serializer.response(db_user, status_code=status.HTTP_201_CREATED)
 
 
 @auth_router.post("/login")
 async def login(
-    response: Response, credentials: OAuth2PasswordRequestForm = Depends()
+    credentials: OAuth2PasswordRequestForm = Depends(),
+    session: AsyncSession = Depends(get_async_session),
 ) -> Token:
     user = await AuthService.authenticate_user(
-        credentials.username, credentials.password
+        session, credentials.username, credentials.password
     )
     if not user:
         raise InvalidCredentialsException
-    token = await AuthService.create_token(user.id)
+    token = await AuthService.create_token(session, user)
+    response = token_serializer.response(token, trusted=True)
     response.set_cookie(
         "access_token",
         token.access_token,
@@ -46,7 +60,7 @@ async def login(
         max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 30 * 24 * 60,
         httponly=True,
     )
-    return token
+    return response
 
 
 @auth_router.post("/logout")
@@ -54,20 +68,25 @@ async def logout(
     request: Request,
     response: Response,
     user: UserModel = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
 ):
     response.delete_cookie("access_token")
     response.delete_cookie("refresh_token")
 
-    await AuthService.logout(request.cookies.get("refresh_token"))
+    await AuthService.logout(session, request.cookies.get("refresh_token"))
     return {"message": "Logged out successfully"}
 
 
 @auth_router.post("/refresh")
-async def refresh_token(request: Request, response: Response) -> Token:
+async def refresh_token(
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+) -> Token:
     new_token = await AuthService.refresh_token(
-        uuid.UUID(request.cookies.get("refresh_token"))
+        session, uuid.UUID(request.cookies.get("refresh_token"))
     )
 
+    response = token_serializer.response(new_token, trusted=True)
     response.set_cookie(
         "access_token",
         new_token.access_token,
@@ -80,41 +99,56 @@ async def refresh_token(request: Request, response: Response) -> Token:
         max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 30 * 24 * 60,
         httponly=True,
     )
-    return new_token
+    return response
 
 
 @auth_router.post("/abort")
 async def abort_all_sessions(
-    response: Response, user: UserModel = Depends(get_current_user)
+    response: Response,
+    user: UserModel = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
 ):
     response.delete_cookie("access_token")
     response.delete_cookie("refresh_token")
 
-    await AuthService.abort_all_sessions(user.id)
+    await AuthService.abort_all_sessions(session, user.id)
     return {"message": "All sessions was aborted"}
 
 
 @user_router.get("")
 async def get_users_list(
-    offset: Optional[int] = 0,
-    limit: Optional[int] = 100,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    offset: Optional[int] = None,
     current_user: UserModel = Depends(get_current_superuser),
-) -> List[User]:
-    return await UserService.get_users_list(offset=offset, limit=limit)
+    session: AsyncSession = Depends(get_async_session),
+) -> Union[Page[User], List[User]]:
+    page = await UserService.get_users_list(
+        session, cursor=cursor, offset=offset, limit=limit
+    )
+    # Clients of the legacy ?offset= listing parse a bare list.
+    if offset is not None:
+        return user_list_serializer.response(page.items)
+    return user_page_serializer.response(page._asdict())
 
 
 @user_router.get("/me")
 async def get_current_user(
     current_user: UserModel = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
 ) -> User:
-    return await UserService.get_user(current_user.id)
+    db_user = await UserService.get_user(session, current_user.id)
+    return user_serializer.response(db_user)
 
 
 @user_router.put("/me")
 async def update_current_user(
-    user: UserUpdate, current_user: UserModel = Depends(get_current_user)
+    user: UserUpdate,
+    current_user: UserModel = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
 ) -> User:
-    return await UserService.update_user(current_user.id, user)
+    db_user = await UserService.update_user(session, current_user.id, user)
+    return user_serializer.response(db_user)
 
 
 @user_router.delete("/me")
@@ -122,32 +156,42 @@ async def delete_current_user(
     request: Request,
     response: Response,
     current_user: UserModel = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
 ):
     response.delete_cookie("access_token")
     response.delete_cookie("refresh_token")
 
-    await AuthService.logout(request.cookies.get("refresh_token"))
-    await UserService.delete_user(current_user.id)
+    await AuthService.logout(session, request.cookies.get("refresh_token"))
+    await UserService.delete_user(session, current_user.id)
     return {"message": "User status is not active already"}
 
 
 @user_router.get("/{user_id}")
 async def get_user(
-    user_id: str, current_user: UserModel = Depends(get_current_superuser)
+    user_id: uuid.UUID,
+    current_user: UserModel = Depends(get_current_superuser),
+    session: AsyncSession = Depends(get_async_session),
 ) -> User:
-    return await UserService.get_user(user_id)
+    db_user = await UserService.get_user(session, user_id)
+    return user_serializer.response(db_user)
 
 
 @user_router.put("/{user_id}")
 async def update_user(
-    user_id: str, user: User, current_user: UserModel = Depends(get_current_superuser)
+    user_id: uuid.UUID,
+    user: User,
+    current_user: UserModel = Depends(get_current_superuser),
+    session: AsyncSession = Depends(get_async_session),
 ) -> User:
-    return await UserService.update_user_from_superuser(user_id, user)
+    db_user = await UserService.update_user_from_superuser(session, user_id, user)
+    return user_serializer.response(db_user)
 
 
 @user_router.delete("/{user_id}")
 async def delete_user(
-    user_id: str, current_user: UserModel = Depends(get_current_superuser)
+    user_id: uuid.UUID,
+    current_user: UserModel = Depends(get_current_superuser),
+    session: AsyncSession = Depends(get_async_session),
 ):
-    await UserService.delete_user_from_superuser(user_id)
+    await UserService.delete_user_from_superuser(session, user_id)
     return {"message": "User was deleted"}
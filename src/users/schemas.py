@@ -33,6 +33,15 @@ class User(UserBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class Principal(BaseModel):
+    id: uuid.UUID
+    is_active: bool
+    is_verified: bool
+    is_superuser: bool
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class UserCreateDB(UserBase):
     hashed_password: Optional[str] = None
 
@@ -1,18 +1,19 @@
 import uuid
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
 from typing import Optional
 
 from fastapi import HTTPException, status
 from jose import jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config import settings
-from ..database import async_session_maker
 from ..exceptions import InvalidTokenException, TokenExpiredException
+from ..pagination import KeysetPage
+from .cache import invalidate_principal
 from .dao import RefreshSessionDAO, UserDAO
 from .models import RefreshSessionModel, UserModel
 from .schemas import (
     RefreshSessionCreate,
-    RefreshSessionUpdate,
     Token,
     User,
     UserCreate,
@@ -25,94 +26,93 @@ from .utils import get_password_hash, is_valid_password
 
 class AuthService:
     @classmethod
-    async def create_token(cls, user_id: uuid.UUID) -> Token:
-        access_token = cls._create_access_token(user_id)
+    async def create_token(cls, session: AsyncSession, user: UserModel) -> Token:
+        access_token = cls._create_access_token(user)
         refresh_token_expires = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
         refresh_token = cls._create_refresh_token()
 
-        async with async_session_maker() as session:
-            await RefreshSessionDAO.add(
-                session,
-                RefreshSessionCreate(
-                    user_id=user_id,
-                    refresh_token=refresh_token,
-                    expires_in=refresh_token_expires.total_seconds(),
-                ),
-            )
-            await session.commit()
+        await RefreshSessionDAO.add_capped(
+            session,
+            RefreshSessionCreate(
+                user_id=user.id,
+                refresh_token=refresh_token,
+                expires_in=refresh_token_expires.total_seconds(),
+            ),
+            max_per_user=settings.MAX_REFRESH_SESSIONS_PER_USER,
+        )
+        await session.commit()
         return Token(
             access_token=access_token, refresh_token=refresh_token, token_type="bearer"
         )
 
     @classmethod
-    async def logout(cls, token: uuid.UUID) -> None:
-        async with async_session_maker() as session:
-            refresh_session = await RefreshSessionDAO.find_one_or_none(
-                session, RefreshSessionModel.refresh_token == token
-            )
-            if refresh_session:
-                await RefreshSessionDAO.delete(session, id=refresh_session.id)
-            await session.commit()
+    async def logout(cls, session: AsyncSession, token: uuid.UUID) -> None:
+        refresh_session = await RefreshSessionDAO.find_one_or_none(
+            session, RefreshSessionModel.refresh_token == token
+        )
+        if refresh_session:
+            await RefreshSessionDAO.delete(session, id=refresh_session.id)
+        await session.commit()
 
     @classmethod
-    async def refresh_token(cls, token: uuid.UUID) -> Token:
-        async with async_session_maker() as session:
-            refresh_session = await RefreshSessionDAO.find_one_or_none(
-                session, RefreshSessionModel.refresh_token == token
-            )
+    async def refresh_token(cls, session: AsyncSession, token: uuid.UUID) -> Token:
+        refresh_token_expires = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        refresh_token = cls._create_refresh_token()
 
-            if refresh_session is None:
-                raise InvalidTokenException
-            if datetime.now(timezone.utc) >= refresh_session.created_at + timedelta(
-                seconds=refresh_session.expires_in
-            ):
-                await RefreshSessionDAO.delete(id=refresh_session.id)
-                raise TokenExpiredException
-
-            user = await UserDAO.find_one_or_none(session, id=refresh_session.user_id)
-            if user is None:
-                raise InvalidTokenException
-
-            access_token = cls._create_access_token(user.id)
-            refresh_token_expires = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-            refresh_token = cls._create_refresh_token()
-
-            await RefreshSessionDAO.update(
-                session,
-                RefreshSessionModel.id == refresh_session.id,
-                obj_in=RefreshSessionUpdate(
-                    refresh_token=refresh_token,
-                    expires_in=refresh_token_expires.total_seconds(),
-                ),
-            )
-            await session.commit()
+        expired, user = await RefreshSessionDAO.rotate(
+            session,
+            token,
+            refresh_token,
+            expires_in=int(refresh_token_expires.total_seconds()),
+        )
+        await session.commit()
+
+        if expired:
+            raise TokenExpiredException
+        if user is None:
+            raise InvalidTokenException
+
+        access_token = cls._create_access_token(user)
         return Token(
             access_token=access_token, refresh_token=refresh_token, token_type="bearer"
         )
 
     @classmethod
-    async def authenticate_user(cls, email: str, password: str) -> Optional[UserModel]:
-        async with async_session_maker() as session:
-            db_user = await UserDAO.find_one_or_none(session, email=email)
-        if db_user and is_valid_password(password, db_user.hashed_password):
+    async def authenticate_user(
+        cls, session: AsyncSession, email: str, password: str
+    ) -> Optional[UserModel]:
+        db_user = await UserDAO.find_one_or_none(session, email=email)
+        if db_user and await is_valid_password(password, db_user.hashed_password):
             return db_user
         return None
 
     @classmethod
-    async def abort_all_sessions(cls, user_id: uuid.UUID):
-        async with async_session_maker() as session:
-            await RefreshSessionDAO.delete(
-                session, RefreshSessionModel.user_id == user_id
-            )
-            await session.commit()
+    async def abort_all_sessions(cls, session: AsyncSession, user_id: uuid.UUID):
+        await RefreshSessionDAO.delete(session, RefreshSessionModel.user_id == user_id)
+        await UserDAO.update(
+            session,
+            UserModel.id == user_id,
+            obj_in={"token_epoch": UserModel.token_epoch + 1},
+        )
+        await session.commit()
+        invalidate_principal(user_id)
 
     @classmethod
-    def _create_access_token(cls, user_id: uuid.UUID) -> str:
+    def _create_access_token(cls, user: UserModel) -> str:
         to_encode = {
-            "sub": str(user_id),
+            "sub": str(user.id),
             "exp": datetime.utcnow()
             + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
         }
+        if settings.STATELESS_AUTH:
+            to_encode.update(
+                {
+                    "is_active": user.is_active,
+                    "is_verified": user.is_verified,
+                    "is_superuser": user.is_superuser,
+                    "token_epoch": user.token_epoch,
+                }
+            )
         encoded_jwt = jwt.encode(
             to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
         )
@@ -125,31 +125,30 @@ class AuthService:
 
 class UserService:
     @classmethod
-    async def register_new_user(cls, user: UserCreate) -> UserModel:
-        async with async_session_maker() as session:
-            user_exist = await UserDAO.find_one_or_none(session, email=user.email)
-            if user_exist:
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT, detail="User already exists"
-                )
-
-            user.is_superuser = False
-            user.is_verified = False
-            db_user = await UserDAO.add(
-                session,
-                UserCreateDB(
-                    **user.model_dump(),
-                    hashed_password=get_password_hash(user.password),
-                ),
+    async def register_new_user(
+        cls, session: AsyncSession, user: UserCreate
+    ) -> UserModel:
+        user_exist = await UserDAO.find_one_or_none(session, email=user.email)
+        if user_exist:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, detail="User already exists"
             )
-            await session.commit()
 
+        user.is_superuser = False
+        user.is_verified = False
+        db_user = await UserDAO.add(
+            session,
+            UserCreateDB(
+                **user.model_dump(),
+                hashed_password=await get_password_hash(user.password),
+            ),
+        )
+        await session.commit()
         return db_user
 
     @classmethod
-    async def get_user(cls, user_id: uuid.UUID) -> UserModel:
-        async with async_session_maker() as session:
-            db_user = await UserDAO.find_one_or_none(session, id=user_id)
+    async def get_user(cls, session: AsyncSession, user_id: uuid.UUID) -> UserModel:
+        db_user = await UserDAO.find_one_or_none(session, id=user_id)
         if db_user is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -157,86 +156,110 @@ class UserService:
         return db_user
 
     @classmethod
-    async def update_user(cls, user_id: uuid.UUID, user: UserUpdate) -> UserModel:
-        async with async_session_maker() as session:
-            db_user = await UserDAO.find_one_or_none(session, UserModel.id == user_id)
-            if db_user is None:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-                )
-
-            if user.password:
-                user_in = UserUpdateDB(
-                    **user.model_dump(
-                        exclude={"is_active", "is_verified", "is_superuser"},
-                        exclude_unset=True,
-                    ),
-                    hashed_password=get_password_hash(user.password),
-                )
-            else:
-                user_in = UserUpdateDB(**user.model_dump())
-
-            user_update = await UserDAO.update(
-                session, UserModel.id == user_id, obj_in=user_in
+    async def get_token_epoch(
+        cls, session: AsyncSession, user_id: uuid.UUID
+    ) -> Optional[int]:
+        return await UserDAO.find_token_epoch(session, user_id)
+
+    @classmethod
+    async def update_user(
+        cls, session: AsyncSession, user_id: uuid.UUID, user: UserUpdate
+    ) -> UserModel:
+        db_user = await UserDAO.find_one_or_none(session, UserModel.id == user_id)
+        if db_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            )
+
+        if user.password:
+            user_in = UserUpdateDB(
+                **user.model_dump(
+                    exclude={"is_active", "is_verified", "is_superuser"},
+                    exclude_unset=True,
+                ),
+                hashed_password=await get_password_hash(user.password),
             )
-            await session.commit()
-            return user_update
+        else:
+            user_in = UserUpdateDB(**user.model_dump())
+
+        update_data = user_in.model_dump(exclude_unset=True)
+        if user.password:
+            # Access tokens issued before the change must stop working.
+            update_data["token_epoch"] = UserModel.token_epoch + 1
+        user_update = await UserDAO.update(
+            session, UserModel.id == user_id, obj_in=update_data
+        )
+        await session.commit()
+        invalidate_principal(user_id)
+        return user_update
 
     @classmethod
-    async def delete_user(cls, user_id: uuid.UUID):
-        async with async_session_maker() as session:
-            db_user = await UserDAO.find_one_or_none(session, id=user_id)
-            if db_user is None:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-                )
-            await UserDAO.update(session, UserModel.id == user_id, {"is_active": False})
-            await session.commit()
+    async def delete_user(cls, session: AsyncSession, user_id: uuid.UUID):
+        db_user = await UserDAO.find_one_or_none(session, id=user_id)
+        if db_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            )
+        await UserDAO.update(
+            session,
+            UserModel.id == user_id,
+            obj_in={"is_active": False, "token_epoch": UserModel.token_epoch + 1},
+        )
+        await session.commit()
+        invalidate_principal(user_id)
 
     @classmethod
     async def get_users_list(
-        cls, *filter, offset: int = 0, limit: int = 100, **filter_by
-    ) -> list[UserModel]:
-        async with async_session_maker() as session:
+        cls,
+        session: AsyncSession,
+        *filter,
+        cursor: Optional[str] = None,
+        offset: Optional[int] = None,
+        limit: int = 100,
+        **filter_by,
+    ) -> KeysetPage:
+        if offset is not None:
             users = await UserDAO.find_all(
                 session, *filter, offset=offset, limit=limit, **filter_by
             )
-        if users is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Users not found"
-            )
-        return users
-        return [
-            User(
-                id=str(db_user.id),
-                email=db_user.email,
-                fio=db_user.fio,
-                is_active=db_user.is_active,
-                is_superuser=db_user.is_superuser,
-            )
-            for db_user in users
-        ]
+            return KeysetPage(users)
+
+        return await UserDAO.find_page(
+            session,
+            *filter,
+            order_by=UserModel.email,
+            cursor=cursor,
+            limit=limit,
+            **filter_by,
+        )
 
     @classmethod
     async def update_user_from_superuser(
-        cls, user_id: uuid.UUID, user: UserUpdate
+        cls, session: AsyncSession, user_id: uuid.UUID, user: UserUpdate
     ) -> User:
-        async with async_session_maker() as session:
-            db_user = await UserDAO.find_one_or_none(session, UserModel.id == user_id)
-            if db_user is None:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-                )
-
-            user_in = UserUpdateDB(**user.model_dump(exclude_unset=True))
-            user_update = await UserDAO.update(
-                session, UserModel.id == user_id, obj_in=user_in
+        db_user = await UserDAO.find_one_or_none(session, UserModel.id == user_id)
+        if db_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
-            await session.commit()
-            return user_update
+
+        user_in = UserUpdateDB(**user.model_dump(exclude_unset=True))
+        user_update = await UserDAO.update(
+            session,
+            UserModel.id == user_id,
+            obj_in={
+                **user_in.model_dump(exclude_unset=True),
+                "token_epoch": UserModel.token_epoch + 1,
+            },
+        )
+        await session.commit()
+        invalidate_principal(user_id)
+        return user_update
 
     @classmethod
-    async def delete_user_from_superuser(cls, user_id: uuid.UUID):
-        async with async_session_maker() as session:
-            await UserDAO.delete(session, UserModel.id == user_id)
-            await session.commit()
+    async def delete_user_from_superuser(
+        cls, session: AsyncSession, user_id: uuid.UUID
+    ):
+        await UserDAO.delete(session, UserModel.id == user_id)
+        await session.commit()
+        invalidate_principal(user_id)
@@ -1,4 +1,7 @@
-from typing import Dict, Optional
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
 
 from fastapi import HTTPException, Request, status
 from fastapi.openapi.models import OAuthFlows as OAuthFlowsModel
@@ -6,8 +9,14 @@ from fastapi.security import OAuth2
 from fastapi.security.utils import get_authorization_scheme_param
 from passlib.context import CryptContext
 
+from ..config import settings
+from ..exceptions import ServiceBusyException
+from ..metrics import register_collector
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+ResultType = TypeVar("ResultType")
+
 
 class OAuth2PasswordBearerWithCookie(OAuth2):
     def __init__(
@@ -38,9 +47,73 @@ class OAuth2PasswordBearerWithCookie(OAuth2):
         return param
 
 
-def is_valid_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+class PasswordHasherPool:
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hasher"
+        )
+
+    async def run(self, func: Callable[..., ResultType], *args: Any) -> ResultType:
+        if self.in_flight >= self.workers + self.queue_size:
+            self.rejected += 1
+            raise ServiceBusyException
+
+        submitted_at = time.monotonic()
+
+        def job():
+            return time.monotonic() - submitted_at, func(*args)
+
+        # A cancelled caller stops waiting but the job keeps its thread, so it
+        # leaves ``in_flight`` only when the executor is done with it.
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        future = self._executor.submit(job)
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        wait, result = await asyncio.wrap_future(future)
+
+        self.completed += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        return result
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "in_flight": self.in_flight,
+            "queue_depth": max(self.in_flight - self.workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_seconds": self.total_wait / self.completed
+            if self.completed
+            else 0.0,
+            "max_wait_seconds": self.max_wait,
+        }
+
+
+password_hasher = PasswordHasherPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
+
+register_collector("password_hasher", password_hasher.stats)
+
+
+async def is_valid_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(
+        pwd_context.verify, plain_password, hashed_password
+    )
 
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    return await password_hasher.run(pwd_context.hash, password)
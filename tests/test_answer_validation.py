@@ -0,0 +1,129 @@
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from src.forms.enums import ItemType  # noqa: E402
+from src.forms.reviews.schemas import AnswerCreate  # noqa: E402
+from src.forms.reviews.validation import FormAnswerValidator  # noqa: E402
+
+
+def item(id, item_type, required=False, options=()):
+    return {
+        "id": id,
+        "item_type": item_type,
+        "required": required,
+        "options": [{"id": option, "title": None, "item_id": id} for option in options],
+    }
+
+
+DOCUMENT = json.dumps(
+    {
+        "title": "Survey",
+        "items": [
+            item(1, "choiceQuestion", required=True, options=[10, 11]),
+            item(2, "multichoiseQuestion", options=[20, 21, 22]),
+            item(3, "textQuestion"),
+        ],
+    }
+).encode()
+
+
+@pytest.fixture
+def validator():
+    return FormAnswerValidator.compile(DOCUMENT)
+
+
+def choice(item_id, *options):
+    return AnswerCreate(item_id=item_id, promt={"options": list(options)})
+
+
+def text(item_id, value):
+    return AnswerCreate(item_id=item_id, promt={"placeholder": value})
+
+
+def empty(item_id):
+    return AnswerCreate(item_id=item_id)
+
+
+def test_compile(validator):
+    assert validator.item_types == {
+        1: ItemType.ChoiceQuestion,
+        2: ItemType.MultichoiseQuestion,
+        3: ItemType.TextQuestion,
+    }
+    assert validator.options == {
+        1: frozenset({10, 11}),
+        2: frozenset({20, 21, 22}),
+        3: frozenset(),
+    }
+    assert validator.required == validator.item_bits[1]
+    assert len(set(validator.item_bits.values())) == 3
+
+
+def test_valid_submission(validator):
+    assert validator.validate([choice(1, 10), choice(2, 20, 22), text(3, "ok")]) is None
+    assert validator.validate([choice(1, 11)]) is None
+
+
+def test_unknown_item(validator):
+    assert "not in the form" in validator.validate([choice(1, 10), text(4, "x")])
+
+
+@pytest.mark.parametrize(
+    "answers",
+    [
+        [choice(1, 10), text(3, "a"), text(3, "b")],
+        [choice(1, 10), empty(3), empty(3)],
+        [choice(1, 10), empty(3), text(3, "a")],
+        [choice(1, 10), text(3, "a"), empty(3)],
+    ],
+)
+def test_duplicate_item(validator, answers):
+    assert "answered twice" in validator.validate(answers)
+
+
+def test_single_choice_accepts_one_option(validator):
+    assert "one option" in validator.validate([choice(1, 10, 11)])
+
+
+def test_unknown_option(validator):
+    assert "no such option" in validator.validate([choice(1, 10), choice(2, 10)])
+
+
+def test_wrong_prompt_kind(validator):
+    assert "expects options" in validator.validate([text(1, "x")])
+    assert "expects text" in validator.validate([choice(1, 10), choice(3, 10)])
+
+
+@pytest.mark.parametrize(
+    "answers", [[], [text(3, "x")], [empty(1)], [choice(1)], [choice(1), text(3, "x")]]
+)
+def test_missing_required_item(validator, answers):
+    assert validator.validate(answers) == "required items are not answered"
+
+
+def test_tally_counts_every_item(validator):
+    counts = validator.tally([choice(1, 10), choice(2, 20, 22), empty(3)])
+    assert counts == {
+        (0, 0): (1, 0),
+        (1, 0): (1, 0),
+        (1, 10): (1, 0),
+        (2, 0): (1, 0),
+        (2, 20): (1, 0),
+        (2, 22): (1, 0),
+        (3, 0): (0, 1),
+    }
+
+
+def test_tally_counts_missing_and_empty_answers_as_skipped(validator):
+    counts = validator.tally([choice(1, 11), choice(2), text(3, "")])
+    assert counts == {
+        (0, 0): (1, 0),
+        (1, 0): (1, 0),
+        (1, 11): (1, 0),
+        (2, 0): (0, 1),
+        (3, 0): (0, 1),
+    }
+    assert validator.tally([choice(1, 10)])[(3, 0)] == (0, 1)
@@ -0,0 +1,107 @@
+import pytest
+
+from src import cache
+from src.cache import LRUCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+def test_evicts_least_recently_used():
+    lru = LRUCache(maxsize=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1
+    lru.set("c", 3)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+
+
+def test_entry_expires_after_ttl(clock):
+    lru = LRUCache(maxsize=10, ttl=5)
+    lru.set("a", 1)
+
+    clock.now += 5
+    assert lru.get("a") == 1
+    clock.now += 0.1
+    assert lru.get("a") is None
+    assert lru.stats()["size"] == 0
+
+
+def test_set_restarts_ttl(clock):
+    lru = LRUCache(maxsize=10, ttl=5)
+    lru.set("a", 1)
+    clock.now += 4
+    lru.set("a", 2)
+    clock.now += 4
+    assert lru.get("a") == 2
+
+
+def test_without_ttl_entries_do_not_expire(clock):
+    lru = LRUCache(maxsize=10)
+    lru.set("a", 1)
+    clock.now += 10**9
+    assert lru.get("a") == 1
+
+
+def test_evicts_by_bytes():
+    lru = LRUCache(maxsize=10, max_bytes=10, sizeof=len)
+    lru.set("a", b"xxxx")
+    lru.set("b", b"xxxx")
+    lru.set("c", b"xxxx")
+
+    assert lru.get("a") is None
+    assert lru.get("b") == b"xxxx"
+    assert lru.get("c") == b"xxxx"
+    assert lru.stats()["bytes"] == 8
+
+
+def test_value_larger_than_max_bytes_is_not_cached():
+    lru = LRUCache(maxsize=10, max_bytes=10, sizeof=len)
+    lru.set("a", b"xxxx")
+    lru.set("b", b"x" * 11)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == b"xxxx"
+    assert lru.stats()["bytes"] == 4
+
+
+def test_replacing_and_invalidating_keep_bytes_in_step():
+    lru = LRUCache(maxsize=10, max_bytes=100, sizeof=len)
+    lru.set("a", b"xxxx")
+    lru.set("a", b"xx")
+    assert lru.stats()["bytes"] == 2
+
+    lru.set("b", b"xxx")
+    lru.invalidate("a")
+    assert lru.stats()["bytes"] == 3
+
+    lru.invalidate_where(lambda key: key == "b")
+    assert lru.stats()["bytes"] == 0
+    assert lru.stats()["size"] == 0
+
+
+def test_stats_count_hits_and_misses():
+    lru = LRUCache(maxsize=10)
+    lru.set("a", 1)
+    lru.get("a")
+    lru.get("b")
+
+    stats = lru.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
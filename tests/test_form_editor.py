@@ -0,0 +1,298 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import HTTPException  # noqa: E402
+
+from src.forms import editor as editor_module  # noqa: E402
+from src.forms.editor import EditedItem, FormEditor  # noqa: E402
+from src.forms.schemas import UpdateSchema  # noqa: E402
+from src.forms.utils import ORDER_KEY_GAP  # noqa: E402
+
+FORM_ID = 7
+
+
+def make_editor(*order_keys, options=None):
+    # Items get ids 1, 2, ... in the given order.
+    editor = FormEditor(FORM_ID)
+    for id, order_key in enumerate(order_keys, start=1):
+        item = EditedItem(id, order_key, position=id)
+        editor.items.append(item)
+        editor.items_by_id[id] = item
+    editor.options = dict(options or {})
+    return editor
+
+
+def apply(editor, *requests):
+    schema = UpdateSchema(includeFormInResponse=False, requests=list(requests))
+    for request in schema.requests:
+        editor.apply(request)
+
+
+def order(editor):
+    return [item.id for item in editor.items]
+
+
+def test_move_item():
+    editor = make_editor(1024, 2048, 3072)
+    apply(editor, {"moveItem": {"original_location": 3, "new_location": 1}})
+    assert order(editor) == [3, 1, 2]
+    assert editor.items[0].order_key is None
+
+
+def test_move_to_same_location_is_a_no_op():
+    editor = make_editor(1024, 2048)
+    apply(editor, {"moveItem": {"original_location": 2, "new_location": 2}})
+    assert order(editor) == [1, 2]
+    assert editor.items[1].order_key == 2048
+
+
+def test_move_missing_location():
+    editor = make_editor(1024)
+    with pytest.raises(HTTPException) as error:
+        apply(editor, {"moveItem": {"original_location": 5, "new_location": 1}})
+    assert error.value.status_code == 404
+
+
+def test_create_item_at_position():
+    editor = make_editor(1024, 2048)
+    apply(
+        editor,
+        {"createItem": {"title": "New", "item_order": 2, "form_id": 999}},
+    )
+    assert order(editor) == [1, None, 2]
+    created = editor.items[1]
+    assert created.values["title"] == "New"
+    assert created.values["form_id"] == FORM_ID
+
+
+def test_delete_item_drops_its_options():
+    editor = make_editor(1024, 2048, options={10: 1, 11: 2})
+    apply(
+        editor,
+        {"updateOption": {"option_id": 10, "option": {"title": "x"}}},
+        {"createOption": {"item_id": 1, "title": "y"}},
+        {"deleteItem": {"id": 1, "location": 1}},
+    )
+    assert order(editor) == [2]
+    assert editor.deleted_item_ids == [1]
+    assert editor.options == {11: 2}
+    assert editor.option_values == {}
+    assert editor.new_options == []
+
+
+def test_delete_unknown_item():
+    editor = make_editor(1024)
+    with pytest.raises(HTTPException):
+        apply(editor, {"deleteItem": {"id": 5, "location": 1}})
+
+
+def test_update_item_merges_values():
+    editor = make_editor(1024)
+    apply(
+        editor,
+        {"op": "updateItem", "updateItem": {"item_id": 1, "item": {"title": "a"}}},
+        {"updateItem": {"item_id": 1, "item": {"required": True}}},
+    )
+    assert editor.items[0].values == {"title": "a", "required": True}
+
+
+def test_option_requests_check_ownership():
+    editor = make_editor(1024, options={10: 1})
+    with pytest.raises(HTTPException):
+        apply(editor, {"createOption": {"item_id": 2, "title": "x"}})
+    with pytest.raises(HTTPException):
+        apply(editor, {"deleteOptionId": 11})
+    apply(editor, {"deleteOptionId": 10})
+    assert editor.deleted_option_ids == [10]
+
+
+def test_order_keys_only_for_new_and_moved_items():
+    editor = make_editor(1024, 2048, 3072)
+    apply(
+        editor,
+        {"moveItem": {"original_location": 1, "new_location": 3}},
+        {"createItem": {"item_order": 1, "form_id": FORM_ID}},
+    )
+    editor._assign_order_keys()
+
+    keys = [item.order_key for item in editor.items]
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+    # The untouched items keep their keys.
+    assert [item.order_key for item in editor.items[1:3]] == [2048, 3072]
+
+
+def test_exhausted_gap_respaces_the_form():
+    editor = make_editor(1, 2)
+    apply(editor, {"createItem": {"item_order": 2, "form_id": FORM_ID}})
+    editor._assign_order_keys()
+
+    assert [item.order_key for item in editor.items] == [
+        ORDER_KEY_GAP,
+        2 * ORDER_KEY_GAP,
+        3 * ORDER_KEY_GAP,
+    ]
+
+
+class FakeDAO:
+    # Records what FormEditor.flush writes instead of talking to a database.
+    def __init__(self, monkeypatch, name, columns=None):
+        self.calls = []
+        self.columns = columns or {}
+        dao = getattr(editor_module, name)
+        for method in ("update", "delete", "add_bulk", "update_bulk"):
+            monkeypatch.setattr(dao, method, self._recorder(method))
+
+    def _recorder(self, method):
+        async def record(session, *args, **kwargs):
+            self.calls.append((method, args, kwargs))
+            if method == "add_bulk":
+                return [
+                    SimpleNamespace(**{**self.columns, "id": 100 + n, **values})
+                    for n, values in enumerate(args[0])
+                ]
+            if method == "update_bulk":
+                return [
+                    SimpleNamespace(**{**self.columns, **values}) for values in args[0]
+                ]
+            if method == "update":
+                return SimpleNamespace(**kwargs["obj_in"])
+            return None
+
+        return record
+
+    def methods(self):
+        return [method for method, _, _ in self.calls]
+
+
+# Stored values of the rows the fake DAOs return, under the written ones.
+ITEM_COLUMNS = {
+    "title": "Question",
+    "description": None,
+    "item_type": "choiceQuestion",
+    "required": False,
+    "form_id": FORM_ID,
+}
+OPTION_COLUMNS = {"title": "Option", "item_id": 1}
+
+
+@pytest.fixture
+def daos(monkeypatch):
+    return SimpleNamespace(
+        form=FakeDAO(monkeypatch, "FormDAO"),
+        item=FakeDAO(monkeypatch, "ItemDAO", ITEM_COLUMNS),
+        option=FakeDAO(monkeypatch, "OptionDAO", OPTION_COLUMNS),
+    )
+
+
+def run_flush(editor):
+    asyncio.run(editor.flush(session=None))
+
+
+def test_flush_writes_one_statement_per_kind(daos):
+    editor = make_editor(1024, 2048, 3072, options={10: 1, 20: 3})
+    apply(
+        editor,
+        {"updateForm": {"title": "Survey"}},
+        {"createItem": {"title": "New", "item_order": 1, "form_id": FORM_ID}},
+        {"createItem": {"title": "Newer", "item_order": 1, "form_id": FORM_ID}},
+        {"deleteItem": {"id": 2, "location": 2}},
+        {"updateItem": {"item_id": 3, "item": {"title": "Renamed"}}},
+        {"createOption": {"item_id": 3, "title": "Yes"}},
+        {"updateOption": {"option_id": 10, "option": {"title": "No"}}},
+        {"deleteOptionId": 20},
+    )
+    run_flush(editor)
+
+    assert daos.form.methods() == ["update"]
+    assert daos.item.methods() == ["delete", "add_bulk", "update_bulk"]
+    assert daos.option.methods() == ["delete", "add_bulk", "update_bulk"]
+
+    _, (new_items,), _ = daos.item.calls[1]
+    assert [item["title"] for item in new_items] == ["Newer", "New"]
+    assert [item.item_order for item in editor.created_items] == [1, 2]
+
+    _, (changed_items,), _ = daos.item.calls[2]
+    assert changed_items == [{"id": 3, "title": "Renamed"}]
+
+
+def test_flush_of_a_form_update_touches_nothing_else(daos):
+    editor = make_editor()
+    apply(editor, {"updateForm": {"title": "Survey"}})
+    run_flush(editor)
+
+    assert daos.form.methods() == ["update"]
+    assert daos.item.calls == []
+    assert daos.option.calls == []
+
+
+def test_flush_writes_keys_of_moved_items_only(daos):
+    editor = make_editor(1024, 2048, 3072)
+    apply(editor, {"moveItem": {"original_location": 3, "new_location": 1}})
+    run_flush(editor)
+
+    assert daos.item.methods() == ["update_bulk"]
+    _, (changed_items,), _ = daos.item.calls[0]
+    assert [item["id"] for item in changed_items] == [3]
+    assert changed_items[0]["order_key"] < 1024
+
+
+def test_delta_reports_rows_as_written(daos):
+    editor = make_editor(1024, 2048, options={10: 1})
+    apply(
+        editor,
+        {"updateItem": {"item_id": 2, "item": {"title": "Renamed"}}},
+        {"updateOption": {"option_id": 10, "option": {"title": "No"}}},
+    )
+    run_flush(editor)
+    delta = editor.delta(version=5)
+
+    assert delta.version == 5
+    [item] = delta.updatedItems
+    assert (item.id, item.title, item.item_order, item.required) == (
+        2,
+        "Renamed",
+        2,
+        False,
+    )
+    assert delta.movedItems == []
+    [option] = delta.updatedOptions
+    assert (option.id, option.title, option.item_id) == (10, "No", 1)
+
+
+def test_delta_lists_every_shifted_item(daos):
+    editor = make_editor(1024, 2048, 3072, 4096)
+    apply(
+        editor,
+        {"deleteItem": {"id": 1, "location": 1}},
+        {"moveItem": {"original_location": 3, "new_location": 1}},
+        {"createItem": {"title": "New", "item_order": 2, "form_id": FORM_ID}},
+    )
+    run_flush(editor)
+    delta = editor.delta(version=2)
+
+    # 4, New, 2, 3 after the save: 4 moved up by the move and the delete,
+    # 2 and 3 were pushed down by the new item.
+    assert [item.item_order for item in delta.createdItems] == [2]
+    assert delta.updatedItems == []
+    assert {(item.id, item.item_order) for item in delta.movedItems} == {
+        (4, 1),
+        (2, 3),
+        (3, 4),
+    }
+    assert delta.deletedItemIds == [1]
+
+
+def test_delta_leaves_out_items_that_kept_their_position(daos):
+    editor = make_editor(1024, 2048, 3072)
+    apply(editor, {"moveItem": {"original_location": 2, "new_location": 3}})
+    run_flush(editor)
+
+    assert {(item.id, item.item_order) for item in editor.delta(1).movedItems} == {
+        (3, 2),
+        (2, 3),
+    }
@@ -0,0 +1,73 @@
+import pytest
+
+pytest.importorskip("fastapi")
+
+from src.forms.utils import (  # noqa: E402
+    ORDER_KEY_GAP,
+    etag_versions,
+    form_etag,
+    order_keys_between,
+)
+
+
+def test_form_etag_is_quoted_version():
+    assert form_etag(3) == '"3"'
+
+
+def test_etag_versions_parses_list():
+    assert etag_versions('"1", "2","3"') == {1, 2, 3}
+
+
+def test_etag_versions_star():
+    assert etag_versions("*") is None
+    assert etag_versions('"1", *') is None
+
+
+def test_etag_versions_ignores_foreign_tags():
+    assert etag_versions('"abc", "4"') == {4}
+    assert etag_versions("") == set()
+
+
+def test_weak_tags_do_not_match_strongly():
+    assert etag_versions('W/"1", "2"') == {2}
+
+
+def test_weak_tags_match_weakly():
+    assert etag_versions('W/"1", "2"', weak=True) == {1, 2}
+
+
+def test_order_keys_for_empty_form():
+    assert order_keys_between(None, None, 3) == [1024, 2048, 3072]
+
+
+def test_order_keys_before_first_item():
+    assert order_keys_between(None, 1024, 2) == [1024 - 2048, 0]
+
+
+def test_order_keys_after_last_item():
+    assert order_keys_between(2048, None, 2) == [3072, 4096]
+
+
+def test_order_keys_between_neighbours_are_increasing_and_inside():
+    keys = order_keys_between(1024, 2048, 3)
+    assert keys == sorted(keys)
+    assert len(set(keys)) == 3
+    assert 1024 < keys[0] and keys[-1] < 2048
+
+
+def test_order_keys_use_up_the_gap():
+    assert order_keys_between(0, 4, 3) == [1, 2, 3]
+    assert order_keys_between(0, 4, 4) is None
+    assert order_keys_between(5, 6, 1) is None
+
+
+def test_gap_allows_repeated_inserts_at_the_same_spot():
+    before, after = ORDER_KEY_GAP, 2 * ORDER_KEY_GAP
+    inserts = 0
+    while True:
+        keys = order_keys_between(before, after, 1)
+        if keys is None:
+            break
+        after = keys[0]
+        inserts += 1
+    assert inserts >= 10
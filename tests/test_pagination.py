@@ -0,0 +1,51 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("fastapi")
+sa = pytest.importorskip("sqlalchemy")
+
+from src.exceptions import InvalidCursorException  # noqa: E402
+from src.pagination import decode_cursor, encode_cursor  # noqa: E402
+
+created_at = sa.Column("created_at", sa.TIMESTAMP(timezone=True))
+id_column = sa.Column("id", sa.Integer())
+user_id = sa.Column("user_id", sa.UUID())
+email = sa.Column("email", sa.String())
+
+
+def test_cursor_round_trip():
+    values = (datetime(2026, 10, 18, 12, 30, tzinfo=timezone.utc), 42)
+    cursor = encode_cursor(False, values)
+    assert decode_cursor(cursor, (created_at, id_column)) == (False, values)
+
+
+def test_cursor_keeps_direction():
+    cursor = encode_cursor(True, ("a@example.com", 7))
+    assert decode_cursor(cursor, (email, id_column)) == (True, ("a@example.com", 7))
+
+
+def test_cursor_round_trips_uuid_and_none():
+    value = uuid.uuid4()
+    cursor = encode_cursor(False, (value, None))
+    assert decode_cursor(cursor, (user_id, email)) == (False, (value, None))
+
+
+def test_cursor_is_url_safe_without_padding():
+    cursor = encode_cursor(False, ("?&/+=" * 5, 1))
+    assert "=" not in cursor
+    assert "+" not in cursor
+    assert "/" not in cursor
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", encode_cursor(False, (1,))])
+def test_malformed_cursor(cursor):
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(cursor, (created_at, id_column))
+
+
+def test_cursor_value_of_wrong_type():
+    cursor = encode_cursor(False, ("abc", "1"))
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(cursor, (email, id_column))
@@ -0,0 +1,127 @@
+# Runs against the test database (MODE=TEST) and skips elsewhere.
+import asyncio
+import uuid
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from sqlalchemy import delete  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from src.config import settings  # noqa: E402
+from src.database import Base  # noqa: E402
+from src.forms.dao import FormDAO, ItemDAO, OptionDAO  # noqa: E402
+from src.forms.models import FormModel  # noqa: E402
+from src.forms.reviews import ingestion as ingestion_module  # noqa: E402
+from src.forms.reviews import service as service_module  # noqa: E402
+from src.forms.reviews.ingestion import ReviewIngestion  # noqa: E402
+from src.forms.reviews.schemas import AnswerCreate, ReviewCreate  # noqa: E402
+from src.forms.reviews.service import ReviewService  # noqa: E402
+from src.forms.schemas import FormCreate  # noqa: E402
+from src.forms.service import FormService  # noqa: E402
+from src.users.dao import UserDAO  # noqa: E402
+from src.users.models import UserModel  # noqa: E402
+
+pytestmark = pytest.mark.skipif(
+    settings.MODE != "TEST", reason="needs the test database"
+)
+
+POOL_SIZE = 2
+SUBMISSIONS = 20
+
+
+async def create_users(session_maker, count):
+    async with session_maker() as session:
+        users = await UserDAO.add_bulk(
+            session,
+            [
+                {
+                    "email": f"ingestion-{uuid.uuid4()}@example.com",
+                    "fio": "Test",
+                    "hashed_password": "-",
+                    "is_verified": True,
+                }
+                for _ in range(count)
+            ],
+        )
+        await session.commit()
+        return [user.id for user in users]
+
+
+async def create_published_form(session_maker, creator_id):
+    async with session_maker() as session:
+        form = await FormDAO.add_with_link(session, FormCreate(creator_id=creator_id))
+        [item] = await ItemDAO.add_bulk(
+            session,
+            [
+                {
+                    "title": "Question",
+                    "item_type": "choiceQuestion",
+                    "order_key": 1024,
+                    "required": True,
+                    "form_id": form.id,
+                }
+            ],
+        )
+        [option] = await OptionDAO.add_bulk(
+            session, [{"title": "Yes", "item_id": item.id}]
+        )
+        await session.commit()
+        await FormService.form_to_review(session, form.id, creator_id)
+    return form.id, [AnswerCreate(item_id=item.id, promt={"options": [option.id]})]
+
+
+async def submit_more_than_the_pool_holds(monkeypatch):
+    # Every request session and the writer share a pool far smaller than the
+    # number of waiting submissions; a request that kept its connection while
+    # waiting would starve the writer until pool_timeout.
+    engine = create_async_engine(
+        settings.TEST_DATABASE_URL,
+        pool_size=POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=5,
+    )
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    ingestion = ReviewIngestion(batch_size=100, max_latency=0.2, queue_size=100)
+    monkeypatch.setattr(ingestion_module, "async_session_maker", session_maker)
+    monkeypatch.setattr(service_module, "review_ingestion", ingestion)
+    monkeypatch.setattr(settings, "REVIEW_GROUP_COMMIT", True)
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    user_ids = await create_users(session_maker, SUBMISSIONS)
+    form_id, answers = await create_published_form(session_maker, user_ids[0])
+
+    async def submit(user_id):
+        async with session_maker() as session:
+            return await ReviewService.create_review(
+                session, ReviewCreate(form_id=form_id, user_id=user_id), answers
+            )
+
+    writer = asyncio.create_task(ingestion.run())
+    try:
+        reviews = await asyncio.wait_for(
+            asyncio.gather(*(submit(user_id) for user_id in user_ids)), timeout=30
+        )
+    finally:
+        writer.cancel()
+        await asyncio.gather(writer, return_exceptions=True)
+        async with session_maker() as session:
+            await session.execute(delete(FormModel).where(FormModel.id == form_id))
+            await session.execute(delete(UserModel).where(UserModel.id.in_(user_ids)))
+            await session.commit()
+        await engine.dispose()
+
+    return ingestion, reviews
+
+
+def test_submissions_beyond_pool_size(monkeypatch):
+    ingestion, reviews = asyncio.run(submit_more_than_the_pool_holds(monkeypatch))
+
+    assert len({review.id for review in reviews}) == SUBMISSIONS
+    assert ingestion.failed_batches == 0
+    assert ingestion.batch_sizes.stats()["count"] < SUBMISSIONS
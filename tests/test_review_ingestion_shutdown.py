@@ -0,0 +1,131 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from src.forms.reviews import ingestion as ingestion_module  # noqa: E402
+from src.forms.reviews.ingestion import ReviewIngestion  # noqa: E402
+
+
+class FakeSession:
+    def __init__(self, store):
+        self.store = store
+        self.pending = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def commit(self):
+        self.store.extend(self.pending)
+
+
+def fake_store(monkeypatch, write):
+    store = []
+    monkeypatch.setattr(
+        ingestion_module, "async_session_maker", lambda: FakeSession(store)
+    )
+
+    async def add_with_answers(session, submissions):
+        await write()
+        session.pending.extend(review for review, _, _ in submissions)
+        return [SimpleNamespace(id=review) for review, _, _ in submissions]
+
+    monkeypatch.setattr(
+        ingestion_module.ReviewDAO, "add_with_answers", staticmethod(add_with_answers)
+    )
+    return store
+
+
+async def submit_and_cancel(ingestion, count, before_cancel):
+    writer = asyncio.create_task(ingestion.run())
+    callers = [asyncio.create_task(ingestion.submit(i, [], None)) for i in range(count)]
+    await before_cancel()
+    writer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await writer
+    return await asyncio.gather(*callers, return_exceptions=True)
+
+
+def test_cancel_while_collecting_writes_the_held_batch(monkeypatch):
+    async def write():
+        pass
+
+    store = fake_store(monkeypatch, write)
+    # A long latency keeps the writer collecting until it is cancelled.
+    ingestion = ReviewIngestion(batch_size=10, max_latency=60, queue_size=100)
+
+    async def before_cancel():
+        await asyncio.sleep(0.01)
+        assert store == []
+
+    results = asyncio.run(submit_and_cancel(ingestion, 5, before_cancel))
+
+    assert sorted(store) == list(range(5))
+    assert [result.id for result in results] == list(range(5))
+
+
+def test_cancel_during_flush_completes_the_batch(monkeypatch):
+    started = None
+    release = None
+
+    async def write():
+        started.set()
+        await release.wait()
+
+    store = fake_store(monkeypatch, write)
+    ingestion = ReviewIngestion(batch_size=10, max_latency=0, queue_size=100)
+
+    async def before_cancel():
+        await started.wait()
+        asyncio.get_running_loop().call_later(0.01, release.set)
+
+    async def main():
+        nonlocal started, release
+        started, release = asyncio.Event(), asyncio.Event()
+        return await submit_and_cancel(ingestion, 3, before_cancel)
+
+    results = asyncio.run(main())
+
+    assert sorted(store) == list(range(3))
+    assert [result.id for result in results] == list(range(3))
+
+
+def test_cancel_with_failing_writes_fails_every_caller(monkeypatch):
+    async def write():
+        raise RuntimeError("database is gone")
+
+    store = fake_store(monkeypatch, write)
+    ingestion = ReviewIngestion(batch_size=3, max_latency=60, queue_size=100)
+
+    async def before_cancel():
+        await asyncio.sleep(0.01)
+
+    results = asyncio.run(submit_and_cancel(ingestion, 5, before_cancel))
+
+    assert store == []
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_cancel_with_failing_flush_fails_every_caller(monkeypatch):
+    async def write():
+        pass
+
+    fake_store(monkeypatch, write)
+    ingestion = ReviewIngestion(batch_size=3, max_latency=60, queue_size=100)
+
+    async def flush(batch):
+        raise RuntimeError("flush failed")
+
+    monkeypatch.setattr(ingestion, "flush", flush)
+
+    async def before_cancel():
+        await asyncio.sleep(0.01)
+
+    results = asyncio.run(submit_and_cancel(ingestion, 5, before_cancel))
+
+    assert all(isinstance(result, RuntimeError) for result in results)